@@ -1,60 +1,78 @@
-from src.database.database import SessionLocal, engine
+from sqlalchemy import MetaData, select, func
+from src.database.database import ScopedSession, engine
 from src.database.models import Base, User, Category
 from src.api.simple_auth import get_password_hash
-import traceback
+import logging
+import logging.handlers
 
-print("🔍 Testing Database Setup...\n")
+# Buffer report lines in memory and write them out once at the end
+stream_handler = logging.StreamHandler()
+stream_handler.setFormatter(logging.Formatter("%(message)s"))
+buffer_handler = logging.handlers.MemoryHandler(capacity=100, target=stream_handler)
+logger = logging.getLogger("dbdebug")
+logger.addHandler(buffer_handler)
+logger.setLevel(logging.INFO)
+logger.propagate = False
+
+logger.info("🔍 Testing Database Setup...\n")
 
 try:
     # Test 1: Database connection
-    print("1. Testing database connection...")
-    db = SessionLocal()
-    print("✅ Database connection successful!")
+    logger.info("1. Testing database connection...")
+    with ScopedSession() as db:
+        logger.info("✅ Database connection successful!")
     
-    # Test 2: Check tables
-    print("\n2. Checking tables...")
-    from sqlalchemy import inspect
-    inspector = inspect(engine)
-    tables = inspector.get_table_names()
-    print(f"✅ Found tables: {tables}")
+    # Test 2: Check tables (one catalog scan, reused below)
+    logger.info("\n2. Checking tables...")
+    reflected = MetaData()
+    reflected.reflect(bind=engine)
+    tables = list(reflected.tables)
+    logger.info(f"✅ Found tables: {tables}")
     
     # Test 3: Try to create tables
-    print("\n3. Creating tables (if not exist)...")
-    Base.metadata.create_all(bind=engine)
-    print("✅ Tables created/verified!")
+    logger.info("\n3. Creating tables (if not exist)...")
+    if set(Base.metadata.tables) <= set(reflected.tables):
+        logger.info("✅ Tables already exist!")
+    else:
+        Base.metadata.create_all(bind=engine)
+        logger.info("✅ Tables created/verified!")
     
     # Test 4: Test password hashing
-    print("\n4. Testing password hashing...")
+    logger.info("\n4. Testing password hashing...")
     test_password = "test123"
     hashed = get_password_hash(test_password)
-    print(f"✅ Password hashed successfully: {hashed[:20]}...")
+    logger.info(f"✅ Password hashed successfully: {hashed[:20]}...")
     
     # Test 5: Try to create a test user
-    print("\n5. Testing user creation...")
-    test_user = User(
-        email="debugtest@example.com",
-        username="debugtest",
-        hashed_password=hashed
-    )
-    db.add(test_user)
-    db.commit()
-    print("✅ Test user created successfully!")
-    
-    # Clean up
-    db.query(User).filter(User.username == "debugtest").delete()
-    db.commit()
-    print("✅ Test user cleaned up!")
+    logger.info("\n5. Testing user creation...")
+    with ScopedSession() as db:
+        test_user = User(
+            email="debugtest@example.com",
+            username="debugtest",
+            hashed_password=hashed
+        )
+        # Flush runs the INSERT inside the open transaction; rolling it back
+        # cleans up without any committed write
+        db.add(test_user)
+        db.flush()
+        logger.info("✅ Test user created successfully!")
+        
+        # Clean up
+        db.rollback()
+        logger.info("✅ Test user cleaned up!")
     
     # Test 6: Check if categories exist
-    print("\n6. Checking categories...")
-    categories = db.query(Category).count()
-    print(f"✅ Found {categories} categories")
+    logger.info("\n6. Checking categories...")
+    with ScopedSession() as db:
+        categories = db.execute(select(func.count()).select_from(Category)).scalar_one()
+        logger.info(f"✅ Found {categories} categories")
     
-    db.close()
-    print("\n✅ All database tests passed!")
+    logger.info("\n✅ All database tests passed!")
     
 except Exception as e:
-    print(f"\n❌ Error occurred: {type(e).__name__}")
-    print(f"Error message: {str(e)}")
-    print("\nFull traceback:")
-    traceback.print_exc()
+    logger.info(f"\n❌ Error occurred: {type(e).__name__}")
+    logger.info(f"Error message: {str(e)}")
+    logger.exception("\nFull traceback:")
+finally:
+    ScopedSession.remove()
+    buffer_handler.close()
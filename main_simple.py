@@ -1,29 +1,5 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
 import os
 
-app = FastAPI(
-    title="AI Finance Assistant API",
-    description="Backend API for personal finance management",
-    version="1.0.0"
-)
+from src.app_factory import create_app
 
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-@app.get("/")
-def root():
-    return {"message": "AI Finance Assistant API is running!"}
-
-@app.get("/health")
-def health():
-    return {"status": "healthy"}
-
-@app.get("/api/v1/test")
-def test():
-    return {"message": "API endpoint working!"}
+app = create_app(os.getenv("APP_PROFILE", "simple"))
@@ -0,0 +1,29 @@
+"""user date indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-15 06:22:09.906262
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # IF NOT EXISTS: databases built by create_all may already have these
+    op.create_index('ix_transactions_user_date', 'transactions', ['user_id', sa.text('transaction_date DESC')], unique=False, if_not_exists=True)
+    op.create_index('ix_alerts_user_created', 'alerts', ['user_id', sa.text('created_at DESC')], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_alerts_user_created', table_name='alerts', if_exists=True)
+    op.drop_index('ix_transactions_user_date', table_name='transactions', if_exists=True)
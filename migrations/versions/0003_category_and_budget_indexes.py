@@ -0,0 +1,31 @@
+"""category and budget indexes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-15 07:05:12.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY keeps PostgreSQL tables writable during the build; it can't
+    # run inside a transaction, hence the autocommit block (ignored on SQLite)
+    with op.get_context().autocommit_block():
+        op.create_index('ix_transactions_user_category_date', 'transactions', ['user_id', 'category_id', 'transaction_date'], unique=False, if_not_exists=True, postgresql_concurrently=True)
+        op.create_index('ix_budgets_user_category', 'budgets', ['user_id', 'category_id'], unique=False, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_budgets_user_category', table_name='budgets', if_exists=True, postgresql_concurrently=True)
+        op.drop_index('ix_transactions_user_category_date', table_name='transactions', if_exists=True, postgresql_concurrently=True)
@@ -0,0 +1,30 @@
+"""backfill amount_inr
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-15 07:41:26.503117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Analytics sum amount_inr; rows imported before it was always set get it here
+    op.execute(
+        "UPDATE transactions SET amount_inr = amount * COALESCE(exchange_rate, 1.0) "
+        "WHERE amount_inr IS NULL"
+    )
+
+
+def downgrade() -> None:
+    # Data-only migration; the backfilled values stay valid
+    pass
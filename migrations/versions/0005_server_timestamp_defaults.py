@@ -0,0 +1,57 @@
+"""server-side created_at defaults
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-15 08:02:47.316550
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, timestamp columns) whose default moved from Python into the database
+TIMESTAMP_COLUMNS = (
+    ('users', ('created_at',)),
+    ('transactions', ('created_at',)),
+    ('budgets', ('created_at', 'updated_at')),
+    ('alerts', ('created_at',)),
+)
+# Batch mode rebuilds SQLite tables from reflection, which drops DESC from
+# these index columns; they are recreated as defined in 0002
+DESC_INDEXES = (
+    ('ix_transactions_user_date', 'transactions', ['user_id', sa.text('transaction_date DESC')]),
+    ('ix_alerts_user_created', 'alerts', ['user_id', sa.text('created_at DESC')]),
+)
+
+
+def _set_defaults(server_default) -> None:
+    for table, columns in TIMESTAMP_COLUMNS:
+        with op.batch_alter_table(table) as batch_op:
+            for column in columns:
+                batch_op.alter_column(column, existing_type=sa.DateTime(), server_default=server_default)
+    
+    if op.get_bind().dialect.name == "sqlite":
+        for name, table, columns in DESC_INDEXES:
+            op.drop_index(name, table_name=table, if_exists=True)
+            op.create_index(name, table, columns, unique=False)
+
+
+def upgrade() -> None:
+    # The columns hold naive UTC. SQLite's CURRENT_TIMESTAMP is UTC already;
+    # PostgreSQL's now() is in the session time zone, so convert it
+    if op.get_bind().dialect.name == "sqlite":
+        _set_defaults(sa.func.now())
+    else:
+        _set_defaults(sa.func.timezone('utc', sa.func.now()))
+
+
+def downgrade() -> None:
+    _set_defaults(None)
@@ -10,4 +10,7 @@ pip install -r requirements_api.txt
 # Create necessary directories
 mkdir -p data/models
 
+# Apply database migrations (stamps databases created before Alembic)
+python -c "from src.database.migrate import upgrade_to_head; upgrade_to_head()"
+
 echo "Build completed!"
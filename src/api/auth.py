@@ -17,8 +17,12 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-this")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# bcrypt work factor - cheap rounds for test runs and bulk seeding only
+ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "4" if ENVIRONMENT == "test" else "12"))
+
 # Fix for bcrypt issue
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=12)
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 def verify_password(plain_password, hashed_password):
@@ -1,22 +1,24 @@
 import os
-from src.database.database import engine, SessionLocal
-from src.database.models import Base, User
+from sqlalchemy import select, func
+from src.database.database import ScopedSession
+from src.database.migrate import upgrade_to_head, truncate_all
+from src.database.models import User
 
 try:
-    # Drop all tables
-    print("Dropping all tables...")
-    Base.metadata.drop_all(bind=engine)
+    # Bring the schema up to date (no DDL when already at head), then wipe the data
+    print("Applying migrations...")
+    upgrade_to_head()
     
-    # Recreate tables
-    print("Creating tables...")
-    Base.metadata.create_all(bind=engine)
+    print("Clearing all tables...")
+    truncate_all()
     
     # Verify
-    db = SessionLocal()
-    user_count = db.query(User).count()
-    print(f"User count after reset: {user_count}")
-    db.close()
+    with ScopedSession() as db:
+        user_count = db.execute(select(func.count()).select_from(User)).scalar_one()
+        print(f"User count after reset: {user_count}")
     
     print("✅ Database reset complete!")
 except Exception as e:
     print(f"❌ Error: {e}")
+finally:
+    ScopedSession.remove()
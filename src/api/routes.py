@@ -1,11 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, insert, select
+from typing import List, Optional
 from datetime import datetime, timedelta
+import csv
+import io
 import json
+import logging
+import orjson
+import os
+import re
+import shutil
+import tempfile
+from itertools import islice
 
-from ..database.database import get_db
+from ..database.database import get_db, SessionLocal
 from ..database import models, schemas
 from ..api.simple_auth import get_current_user, create_access_token, authenticate_user, get_password_hash
 from ..parsers.sms_parser import SMSParser
@@ -16,8 +27,10 @@ from ..services.budget_service import BudgetService
 from ..services.prediction_service import PredictionService
 # from ..parsers.receipt_parser import ReceiptParser
 from ..services.currency_service import CurrencyService
+from ..utils.dates import parse_iso_date
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 currency_service = CurrencyService()
 
 @router.get("/test")
@@ -29,6 +42,9 @@ def test_endpoint():
 def simple_register(email: str, username: str, password: str, db: Session = Depends(get_db)):
     """Simplified registration for debugging"""
     try:
+        # Hash before the first query so no pooled connection is held while hashing
+        hashed_pw = get_password_hash(password)
+        
         # Check if user exists
         existing_user = db.query(models.User).filter(
             (models.User.email == email) | (models.User.username == username)
@@ -38,7 +54,6 @@ def simple_register(email: str, username: str, password: str, db: Session = Depe
             return {"error": "User already exists"}
         
         # Create user
-        hashed_pw = get_password_hash(password)
         new_user = models.User(
             email=email,
             username=username,
@@ -54,16 +69,71 @@ def simple_register(email: str, username: str, password: str, db: Session = Depe
 
 
 
+# Query keywords -> category names for the natural language endpoint
+CATEGORY_KEYWORDS = {
+    "food": "Food & Dining",
+    "dining": "Food & Dining",
+    "shopping": "Shopping",
+    "entertainment": "Entertainment",
+    "transport": "Transportation",
+    "bills": "Bills & Utilities"
+}
+CATEGORY_KEYWORD_RE = re.compile("|".join(map(re.escape, CATEGORY_KEYWORDS)))
+
+# Rows categorised and inserted per statement when importing
+IMPORT_BATCH_SIZE = 1000
+# Rows fetched and sent per chunk when exporting
+EXPORT_BATCH_SIZE = 1000
+# Rows in the first streamed transactions chunk, so clients can render early
+STREAM_FIRST_CHUNK = 50
+
 # Initialize services
 sms_parser = SMSParser()
 pdf_parser = PDFStatementParser()
 categorizer = TransactionCategorizer()
+analytics_service = AnalyticsService()
+budget_service = BudgetService()
+prediction_service = PredictionService()
+
+# Categories every new user starts with
+DEFAULT_CATEGORIES = tuple(categorizer.categories)
+
+# (user_id, category name) -> category id. Categories are never renamed or
+# deleted, so a cached id stays valid; misses always go to the database,
+# which also picks up categories created by other workers.
+CATEGORY_ID_CACHE_SIZE = 50000
+_category_id_cache = {}
+
+
+def _category_id(db: Session, user_id: int, name: str):
+    """Look up a user's category id by name, cached per process"""
+    key = (user_id, name)
+    category_id = _category_id_cache.get(key)
+    if category_id is None:
+        category_id = db.query(models.Category.id).filter(
+            models.Category.name == name,
+            models.Category.user_id == user_id
+        ).scalar()
+        if category_id is not None:
+            if len(_category_id_cache) >= CATEGORY_ID_CACHE_SIZE:
+                _category_id_cache.clear()
+            _category_id_cache[key] = category_id
+    return category_id
+
+
+def _category_ids_by_name(db: Session, user_id: int):
+    """Map category name -> category id for a user"""
+    return dict(db.query(models.Category.name, models.Category.id).filter(models.Category.user_id == user_id).all())
 
 # Authentication endpoints
 @router.post("/register", response_model=schemas.UserResponse)
 def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
     """Register a new user"""
-    print(f"Registration attempt - Email: {user.email}, Username: {user.username}")
+    logger.debug("Registration attempt - Email: %s, Username: %s", user.email, user.username)
+    
+    # Hash before the first query so no pooled connection is held while hashing
+    # (this sync handler already runs on a worker thread, not the event loop)
+    hashed_password = get_password_hash(user.password)
     
     # Check if user exists
     db_user = db.query(models.User).filter(
@@ -71,62 +141,57 @@ def register(user: schemas.UserCreate, db: Session = Depends(get_db)):
     ).first()
     
     if db_user:
-        print(f"User already exists - Email: {db_user.email}, Username: {db_user.username}")
+        logger.debug("User already exists - Email: %s, Username: %s", db_user.email, db_user.username)
         raise HTTPException(status_code=400, detail="Email or username already registered")
     
     try:
         # Create new user
-        hashed_password = get_password_hash(user.password)
         db_user = models.User(
             email=user.email,
             username=user.username,
             hashed_password=hashed_password
         )
         db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
-        print(f"User created successfully - ID: {db_user.id}")
+        # Flush for the id; user and categories commit together below
+        db.flush()
         
-        # Create default categories for user
-        default_categories = categorizer.categories
-        for cat_name in default_categories:
-            category = models.Category(
-                name=cat_name,
-                user_id=db_user.id,
-                is_default=True
-            )
-            db.add(category)
+        # Create default categories for user in one INSERT
+        db.execute(insert(models.Category), [
+            {"name": cat_name, "user_id": db_user.id, "is_default": True}
+            for cat_name in DEFAULT_CATEGORIES
+        ])
         db.commit()
-        print(f"Created {len(default_categories)} default categories")
+        logger.debug("User created successfully - ID: %s, with %d default categories", db_user.id, len(DEFAULT_CATEGORIES))
         
         return db_user
         
     except Exception as e:
-        print(f"Error during registration: {type(e).__name__} - {str(e)}")
+        logger.exception("Error during registration")
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/login")
 def login(username: str = Form(...), password: str = Form(...), db: Session = Depends(get_db)):
     """Login and get access token"""
-    print(f"Login attempt - Username: {username}")
+    logger.debug("Login attempt - Username: %s", username)
     
     user = authenticate_user(db, username, password)
     if not user:
-        print(f"Login failed - User not found or wrong password")
-        # Let's check if user exists
-        user_check = db.query(models.User).filter(models.User.username == username).first()
-        if user_check:
-            print(f"User exists in DB: {user_check.username}, Email: {user_check.email}")
-        else:
-            print("User not found in database")
+        logger.debug("Login failed - User not found or wrong password")
+        # Only pay for the extra lookup when debug logging is on
+        if logger.isEnabledFor(logging.DEBUG):
+            user_check = db.query(models.User).filter(models.User.username == username).first()
+            if user_check:
+                logger.debug("User exists in DB: %s, Email: %s", user_check.username, user_check.email)
+            else:
+                logger.debug("User not found in database")
         
         raise HTTPException(
             status_code=401,
             detail="Incorrect username or password"
         )
     
-    print(f"Login successful for user: {user.username}")
+    logger.debug("Login successful for user: %s", user.username)
     access_token_expires = timedelta(minutes=30)
     access_token = create_access_token(
         data={"sub": user.username}, expires_delta=access_token_expires
@@ -147,9 +212,7 @@ def create_transaction(
     exchange_rate = 1.0
     
     if transaction.currency != "INR":
-        amount_inr = currency_service.convert_to_inr(transaction.amount, transaction.currency)
-        rates = currency_service.get_exchange_rates(transaction.currency)
-        exchange_rate = rates.get("INR", 1.0)
+        amount_inr, exchange_rate = currency_service.quote(transaction.amount, transaction.currency)
     
     db_transaction = models.Transaction(
         user_id=current_user.id,
@@ -169,10 +232,9 @@ def create_transaction(
     
     # Check budget (using INR amount)
     if transaction.transaction_type == "expense":
-        budget_service = BudgetService(db)
-        alert = budget_service.check_budget_alert(current_user.id, transaction.category_id)
+        alert = budget_service.check_budget_alert(db, current_user.id, transaction.category_id)
         if alert:
-            print(f"Budget alert created: {alert.title}")
+            logger.info("Budget alert created: %s", alert.title)
     
     return db_transaction
 
@@ -185,11 +247,43 @@ def get_transactions(
     db: Session = Depends(get_db)
 ):
     """Get user's transactions"""
-    transactions = db.query(models.Transaction).filter(
+    # The response includes each category; load them in the same query
+    transactions = db.query(models.Transaction).options(
+        joinedload(models.Transaction.category)
+    ).filter(
         models.Transaction.user_id == current_user.id
-    ).offset(skip).limit(limit).all()
+    ).order_by(models.Transaction.transaction_date.desc()).offset(skip).limit(limit).all()
+    # Return the rows themselves: response_model reads them in one pydantic-core
+    # pass, which beats building models in Python with model_construct
     return transactions
 
+@router.get("/transactions/stream")
+def stream_transactions(
+    limit: Optional[int] = None,
+    current_user: models.User = Depends(get_current_user)
+):
+    """Stream the user's transactions as NDJSON, newest first.
+
+    Each line is one TransactionResponse object, so clients can render rows
+    as they arrive instead of waiting for the whole list. ``limit`` caps the
+    number of rows; without it the whole history is sent.
+    """
+    if limit is not None and limit < 1:
+        raise HTTPException(status_code=400, detail="limit must be a positive integer")
+
+    def iter_ndjson():
+        batch = []
+        for i, t in enumerate(_export_rows(current_user.id, limit), 1):
+            batch.append(orjson.dumps(schemas.TransactionResponse.model_validate(t).model_dump()))
+            # Small first chunk for a fast first render, then full batches
+            if i == STREAM_FIRST_CHUNK or len(batch) == EXPORT_BATCH_SIZE:
+                yield b"\n".join(batch) + b"\n"
+                batch = []
+        if batch:
+            yield b"\n".join(batch) + b"\n"
+
+    return StreamingResponse(iter_ndjson(), media_type="application/x-ndjson")
+
 @router.post("/transactions/parse-sms")
 def parse_sms_transactions(
     sms_text: str = Form(...),
@@ -211,34 +305,27 @@ def parse_sms_transactions(
             
         category_name, confidence = categorizer.predict(description)
         
-        # Find category
-        category = db.query(models.Category).filter(
-            models.Category.name == category_name,
-            models.Category.user_id == current_user.id
-        ).first()
+        # Find category, falling back to the default "Others" category
+        category_id = (
+            _category_id(db, current_user.id, category_name)
+            or _category_id(db, current_user.id, "Others")
+        )
         
-        # If category not found, use default "Others" category
-        if not category:
-            category = db.query(models.Category).filter(
-                models.Category.name == "Others",
-                models.Category.user_id == current_user.id
-            ).first()
-            
-            # If still no category, create it
-            if not category:
-                category = models.Category(
-                    name="Others",
-                    user_id=current_user.id,
-                    is_default=True
-                )
-                db.add(category)
-                db.commit()
-                db.refresh(category)
+        # If still no category, create it
+        if not category_id:
+            category = models.Category(
+                name="Others",
+                user_id=current_user.id,
+                is_default=True
+            )
+            db.add(category)
+            db.commit()
+            category_id = category.id
         
         # Handle date
         if parsed['date']:
             try:
-                transaction_date = datetime.strptime(parsed['date'], '%Y-%m-%d')
+                transaction_date = parse_iso_date(parsed['date'])
             except:
                 transaction_date = datetime.now()
         else:
@@ -251,9 +338,7 @@ def parse_sms_transactions(
         exchange_rate = 1.0
         
         if currency != 'INR':
-            amount_inr = currency_service.convert_to_inr(amount, currency)
-            rates = currency_service.get_exchange_rates(currency)
-            exchange_rate = rates.get('INR', 1.0)
+            amount_inr, exchange_rate = currency_service.quote(amount, currency)
         
         # Create transaction
         transaction = models.Transaction(
@@ -263,7 +348,7 @@ def parse_sms_transactions(
             amount_inr=amount_inr,
             exchange_rate=exchange_rate,
             description=description,
-            category_id=category.id,
+            category_id=category_id,
             transaction_type='expense' if parsed.get('type') == 'debit' else 'income',
             transaction_date=transaction_date,
             source='bank_sms',
@@ -279,10 +364,9 @@ def parse_sms_transactions(
         
         # Check budget for expense transactions
         if transaction.transaction_type == "expense":
-            budget_service = BudgetService(db)
-            alert = budget_service.check_budget_alert(current_user.id, transaction.category_id)
+            alert = budget_service.check_budget_alert(db, current_user.id, transaction.category_id)
             if alert:
-                print(f"Budget alert created: {alert.title}")
+                logger.info("Budget alert created: %s", alert.title)
         
         return {
             "transaction_id": transaction.id,
@@ -295,13 +379,77 @@ def parse_sms_transactions(
     except HTTPException:
         raise
     except Exception as e:
-        print(f"Error in SMS parsing: {type(e).__name__}: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in SMS parsing")
         raise HTTPException(status_code=500, detail=f"Internal error: {str(e)}")
 
 
 
+def _import_pdf_statement(upload, user_id: int, db: Session):
+    """Parse an uploaded PDF statement and store its rows as transactions"""
+    # Copy the upload in chunks to a private temp dir (removed on exit) and
+    # parse it there. A closed file is used rather than NamedTemporaryFile
+    # so the PDF libraries can reopen it by path on Windows too.
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_path = os.path.join(temp_dir, "statement.pdf")
+        with open(temp_path, "wb") as buffer:
+            shutil.copyfileobj(upload, buffer)
+        
+        df = pdf_parser.parse_statement(temp_path)
+    
+    # Load the user's categories once instead of querying per row
+    category_ids = _category_ids_by_name(db, user_id)
+    
+    # Categorise every row in one model call
+    rows = [row for _, row in df.iterrows()]
+    descriptions = [row.get('description', 'Transaction') for row in rows]
+    predictions = categorizer.predict_batch(descriptions)
+    
+    # Process transactions
+    created_transactions = []
+    for row, description, (category_name, _) in zip(rows, descriptions, predictions):
+        category_id = category_ids.get(category_name) or category_ids.get("Others")
+        
+        # Determine transaction type and amount
+        amount = row.get('amount', 0)
+        if 'debit' in row and row['debit']:
+            amount = row['debit']
+            trans_type = 'expense'
+        elif 'credit' in row and row['credit']:
+            amount = row['credit']
+            trans_type = 'income'
+        else:
+            trans_type = 'expense' if amount > 0 else 'income'
+            amount = abs(amount)
+        
+        created_transactions.append({
+            "user_id": user_id,
+            "amount": amount,
+            "description": description,
+            "category_id": category_id,
+            "transaction_type": trans_type,
+            "transaction_date": row.get('date', datetime.now()),
+            "source": 'pdf',
+            "raw_text": str(row.to_dict())
+        })
+    
+    # One executemany INSERT; the ids aren't needed so nothing is refreshed
+    if created_transactions:
+        db.execute(insert(models.Transaction), created_transactions)
+    db.commit()
+    
+    # Check each touched budget once rather than once per imported expense
+    alerts = budget_service.check_budget_alerts_bulk(db, user_id, {
+        t["category_id"] for t in created_transactions
+        if t["transaction_type"] == 'expense' and t["category_id"]
+    })
+    
+    return {
+        "message": f"Successfully imported {len(created_transactions)} transactions",
+        "count": len(created_transactions),
+        "budget_alerts": [alert.title for alert in alerts]
+    }
+
+
 @router.post("/transactions/upload-pdf")
 async def upload_pdf_statement(
     file: UploadFile = File(...),
@@ -309,68 +457,8 @@ async def upload_pdf_statement(
     db: Session = Depends(get_db)
 ):
     """Upload and parse PDF bank statement"""
-    # Save uploaded file temporarily
-    temp_path = f"temp_{current_user.id}_{file.filename}"
-    with open(temp_path, "wb") as buffer:
-        content = await file.read()
-        buffer.write(content)
-    
-    try:
-        # Parse PDF
-        df = pdf_parser.parse_statement(temp_path)
-        
-        # Process transactions
-        created_transactions = []
-        for _, row in df.iterrows():
-            # Get category prediction
-            description = row.get('description', 'Transaction')
-            category_name, _ = categorizer.predict(description)
-            
-            # Find category
-            category = db.query(models.Category).filter(
-                models.Category.name == category_name,
-                models.Category.user_id == current_user.id
-            ).first()
-            
-            # Determine transaction type and amount
-            amount = row.get('amount', 0)
-            if 'debit' in row and row['debit']:
-                amount = row['debit']
-                trans_type = 'expense'
-            elif 'credit' in row and row['credit']:
-                amount = row['credit']
-                trans_type = 'income'
-            else:
-                trans_type = 'expense' if amount > 0 else 'income'
-                amount = abs(amount)
-            
-            # Create transaction
-            transaction = models.Transaction(
-                user_id=current_user.id,
-                amount=amount,
-                description=description,
-                category_id=category.id if category else None,
-                transaction_type=trans_type,
-                transaction_date=row.get('date', datetime.now()),
-                source='pdf',
-                raw_text=str(row.to_dict())
-            )
-            
-            db.add(transaction)
-            created_transactions.append(transaction)
-        
-        db.commit()
-        
-        return {
-            "message": f"Successfully imported {len(created_transactions)} transactions",
-            "count": len(created_transactions)
-        }
-        
-    finally:
-        # Clean up temp file
-        import os
-        if os.path.exists(temp_path):
-            os.remove(temp_path)
+    # Copying, parsing and the inserts are blocking; keep them off the event loop
+    return await run_in_threadpool(_import_pdf_statement, file.file, current_user.id, db)
 
 # Analytics endpoints
 @router.get("/analytics/spending-by-category")
@@ -381,8 +469,7 @@ def get_spending_by_category(
     db: Session = Depends(get_db)
 ):
     """Get spending breakdown by category"""
-    analytics = AnalyticsService(db)
-    return analytics.get_spending_by_category(current_user.id, start_date, end_date)
+    return analytics_service.get_spending_by_category(db, current_user.id, start_date, end_date)
 
 @router.get("/analytics/monthly-trend")
 def get_monthly_trend(
@@ -391,8 +478,7 @@ def get_monthly_trend(
     db: Session = Depends(get_db)
 ):
     """Get monthly income/expense trend"""
-    analytics = AnalyticsService(db)
-    return analytics.get_monthly_trend(current_user.id, months)
+    return analytics_service.get_monthly_trend(db, current_user.id, months)
 
 @router.get("/analytics/insights")
 def get_insights(
@@ -400,8 +486,7 @@ def get_insights(
     db: Session = Depends(get_db)
 ):
     """Get AI-generated financial insights"""
-    analytics = AnalyticsService(db)
-    return analytics.get_insights(current_user.id)
+    return analytics_service.get_insights(db, current_user.id)
 
 # Category endpoints
 @router.get("/categories/", response_model=List[schemas.CategoryResponse])
@@ -446,18 +531,20 @@ def natural_language_query(
     now = datetime.now()
     start_date = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
     
-    # Calculate common values once
-    income_total = db.query(func.sum(models.Transaction.amount)).filter(
-        models.Transaction.user_id == current_user.id,
-        models.Transaction.transaction_type == 'income',
-        models.Transaction.transaction_date >= start_date
-    ).scalar() or 0
-    
-    expense_total = db.query(func.sum(models.Transaction.amount)).filter(
-        models.Transaction.user_id == current_user.id,
-        models.Transaction.transaction_type == 'expense',
-        models.Transaction.transaction_date >= start_date
-    ).scalar() or 0
+    # Calculate common values once - sums and counts per type in one query
+    totals = {
+        trans_type: (total or 0, count)
+        for trans_type, total, count in db.query(
+            models.Transaction.transaction_type,
+            func.sum(models.Transaction.amount_inr),
+            func.count(models.Transaction.id)
+        ).filter(
+            models.Transaction.user_id == current_user.id,
+            models.Transaction.transaction_date >= start_date
+        ).group_by(models.Transaction.transaction_type)
+    }
+    income_total, income_count = totals.get('income', (0, 0))
+    expense_total, expense_count = totals.get('expense', (0, 0))
     
     # Check queries in specific order (most specific first)
     
@@ -501,26 +588,14 @@ def natural_language_query(
     
     # Spending queries
     elif "spent" in query_lower and ("month" in query_lower or "total" in query_lower):
-        count = db.query(models.Transaction).filter(
-            models.Transaction.user_id == current_user.id,
-            models.Transaction.transaction_type == 'expense',
-            models.Transaction.transaction_date >= start_date
-        ).count()
-        
         return {
             "query": query,
-            "answer": f"You have spent ₹{expense_total:,.2f} this month across {count} transactions.",
-            "data": {"total_spending": expense_total, "transaction_count": count}
+            "answer": f"You have spent ₹{expense_total:,.2f} this month across {expense_count} transactions.",
+            "data": {"total_spending": expense_total, "transaction_count": expense_count}
         }
     
     # Income/Earning queries
     elif "earn" in query_lower or ("income" in query_lower and "how much" in query_lower):
-        income_count = db.query(models.Transaction).filter(
-            models.Transaction.user_id == current_user.id,
-            models.Transaction.transaction_type == 'income',
-            models.Transaction.transaction_date >= start_date
-        ).count()
-        
         return {
             "query": query,
             "answer": f"You have earned ₹{income_total:,.2f} this month from {income_count} income source(s).",
@@ -545,10 +620,8 @@ def natural_language_query(
     
     # Category queries
     elif "category" in query_lower or "most" in query_lower:
-        analytics = AnalyticsService(db)
-        spending = analytics.get_spending_by_category(current_user.id, start_date)
-        if spending:
-            top = max(spending, key=lambda x: x['amount'])
+        top = analytics_service.get_top_category(db, current_user.id, start_date)
+        if top:
             return {
                 "query": query,
                 "answer": f"Your highest spending category is {top['category']} with ₹{top['amount']:,.2f} ({top['percentage']:.1f}% of total spending).",
@@ -576,38 +649,23 @@ def natural_language_query(
         }
     
     # Specific category spending (food, shopping, etc.)
-    elif any(cat.lower() in query_lower for cat in ["food", "dining", "shopping", "entertainment", "transport", "bills"]):
-        # Find which category was mentioned
-        category_map = {
-            "food": "Food & Dining",
-            "dining": "Food & Dining",
-            "shopping": "Shopping",
-            "entertainment": "Entertainment",
-            "transport": "Transportation",
-            "bills": "Bills & Utilities"
-        }
+    elif (category_match := CATEGORY_KEYWORD_RE.search(query_lower)):
+        mentioned_cat = CATEGORY_KEYWORDS[category_match.group()]
         
-        mentioned_cat = None
-        for key, value in category_map.items():
-            if key in query_lower:
-                mentioned_cat = value
-                break
+        cat_total = db.query(func.sum(models.Transaction.amount_inr)).join(
+            models.Category
+        ).filter(
+            models.Transaction.user_id == current_user.id,
+            models.Transaction.transaction_type == 'expense',
+            models.Category.name == mentioned_cat,
+            models.Transaction.transaction_date >= start_date
+        ).scalar() or 0
         
-        if mentioned_cat:
-            cat_total = db.query(func.sum(models.Transaction.amount)).join(
-                models.Category
-            ).filter(
-                models.Transaction.user_id == current_user.id,
-                models.Transaction.transaction_type == 'expense',
-                models.Category.name == mentioned_cat,
-                models.Transaction.transaction_date >= start_date
-            ).scalar() or 0
-            
-            return {
-                "query": query,
-                "answer": f"You have spent ₹{cat_total:,.2f} on {mentioned_cat} this month.",
-                "data": {"category": mentioned_cat, "amount": cat_total}
-            }
+        return {
+            "query": query,
+            "answer": f"You have spent ₹{cat_total:,.2f} on {mentioned_cat} this month.",
+            "data": {"category": mentioned_cat, "amount": cat_total}
+        }
     
     # Default response
     else:
@@ -619,67 +677,103 @@ def natural_language_query(
 
 
 # Import from various sources
-@router.post("/import/csv")
-async def import_csv(
-    file: UploadFile = File(...),
-    current_user: models.User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Import transactions from CSV file"""
-    import csv
-    import io
-    
-    content = await file.read()
-    decoded = content.decode('utf-8')
-    csv_reader = csv.DictReader(io.StringIO(decoded))
+def _import_csv_rows(csv_reader, user_id: int, db: Session):
+    """Store parsed CSV rows as transactions, inserting IMPORT_BATCH_SIZE rows at a time.
+
+    The whole file is one transaction: a bad row rolls back every insert before
+    it, so a corrected upload can be retried without duplicating rows.
+    """
+    category_ids = _category_ids_by_name(db, user_id)
     
     transactions_created = 0
-    for row in csv_reader:
-        # Map CSV columns to transaction fields
-        amount = float(row.get('amount', row.get('Amount', 0)))
-        description = row.get('description', row.get('Description', 'Imported transaction'))
-        date_str = row.get('date', row.get('Date', ''))
-        
-        # Parse date
+    expense_category_ids = set()
+    while True:
         try:
-            trans_date = datetime.strptime(date_str, '%Y-%m-%d')
-        except:
-            trans_date = datetime.now()
+            rows = list(islice(csv_reader, IMPORT_BATCH_SIZE))
+        except ValueError:
+            # Undecodable bytes surface while reading the next batch
+            db.rollback()
+            raise HTTPException(
+                status_code=400,
+                detail=f"Could not read the CSV after row {transactions_created}; nothing was imported"
+            )
+        if not rows:
+            break
         
-        # Predict category
-        category_name, _ = categorizer.predict(description)
-        category = db.query(models.Category).filter(
-            models.Category.name == category_name,
-            models.Category.user_id == current_user.id
-        ).first()
+        descriptions = [row.get('description', row.get('Description', 'Imported transaction')) for row in rows]
+        predictions = categorizer.predict_batch(descriptions)
         
-        # Determine transaction type
-        trans_type = row.get('type', 'expense')
-        if 'credit' in description.lower() or 'deposit' in description.lower():
-            trans_type = 'income'
+        transactions = []
+        for row_number, (row, description, (category_name, _)) in enumerate(
+            zip(rows, descriptions, predictions), transactions_created + 1
+        ):
+            # Map CSV columns to transaction fields
+            try:
+                amount = float(row.get('amount', row.get('Amount', 0)))
+            except (TypeError, ValueError):
+                db.rollback()
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Invalid amount in CSV row {row_number}; nothing was imported"
+                )
+            date_str = row.get('date', row.get('Date', ''))
+            
+            # Parse date
+            try:
+                trans_date = parse_iso_date(date_str)
+            except:
+                trans_date = datetime.now()
+            
+            category_id = category_ids.get(category_name) or category_ids.get("Others")
+            
+            # Determine transaction type
+            trans_type = row.get('type', 'expense')
+            if 'credit' in description.lower() or 'deposit' in description.lower():
+                trans_type = 'income'
+            
+            transactions.append({
+                "user_id": user_id,
+                "amount": abs(amount),
+                "description": description,
+                "category_id": category_id,
+                "transaction_type": trans_type,
+                "transaction_date": trans_date,
+                "source": 'csv',
+                "raw_text": json.dumps(row)
+            })
         
-        # Create transaction
-        transaction = models.Transaction(
-            user_id=current_user.id,
-            amount=abs(amount),
-            description=description,
-            category_id=category.id if category else None,
-            transaction_type=trans_type,
-            transaction_date=trans_date,
-            source='csv',
-            raw_text=json.dumps(row)
+        db.execute(insert(models.Transaction), transactions)
+        transactions_created += len(transactions)
+        expense_category_ids.update(
+            t["category_id"] for t in transactions
+            if t["transaction_type"] == 'expense' and t["category_id"]
         )
-        
-        db.add(transaction)
-        transactions_created += 1
     
     db.commit()
     
+    # Check each touched budget once rather than once per imported expense
+    alerts = budget_service.check_budget_alerts_bulk(db, user_id, expense_category_ids)
+    
     return {
         "message": f"Successfully imported {transactions_created} transactions from CSV",
-        "count": transactions_created
+        "count": transactions_created,
+        "budget_alerts": [alert.title for alert in alerts]
     }
 
+
+@router.post("/import/csv")
+async def import_csv(
+    file: UploadFile = File(...),
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Import transactions from CSV file"""
+    # Read straight from the spooled upload; rows are decoded as the worker iterates
+    csv_reader = csv.DictReader(io.TextIOWrapper(file.file, encoding='utf-8', newline=''))
+    
+    # The per-row categorisation and inserts are blocking; run them on a worker thread
+    return await run_in_threadpool(_import_csv_rows, csv_reader, current_user.id, db)
+
 # Budget management
 @router.post("/budget/set")
 def set_budget(
@@ -706,6 +800,23 @@ def set_budget(
         "budget_amount": amount
     }
 
+def _export_rows(user_id: int, limit: Optional[int] = None):
+    """Yield the user's transactions (newest first, at most ``limit``) in batches from a dedicated session.
+
+    The session lives inside the generator so it stays open for as long as
+    the response is streaming, independent of the request's get_db session.
+    """
+    stmt = select(models.Transaction).options(
+        joinedload(models.Transaction.category)
+    ).where(
+        models.Transaction.user_id == user_id
+    ).order_by(
+        models.Transaction.transaction_date.desc()
+    ).limit(limit).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    with SessionLocal() as session:
+        yield from session.execute(stmt).scalars()
+
+
 @router.get("/export/transactions")
 def export_transactions(
     format: str = "csv",  # csv or json
@@ -713,45 +824,57 @@ def export_transactions(
     db: Session = Depends(get_db)
 ):
     """Export user's transactions"""
-    transactions = db.query(models.Transaction).filter(
-        models.Transaction.user_id == current_user.id
-    ).all()
-    
     if format == "json":
-        return [{
-            "id": t.id,
-            "date": t.transaction_date.isoformat(),
-            "description": t.description,
-            "amount": t.amount,
-            "type": t.transaction_type,
-            "category": t.category.name if t.category else None
-        } for t in transactions]
+        def iter_json():
+            # Encoded rows are sent EXPORT_BATCH_SIZE at a time, like the CSV export
+            prefix = b"["
+            batch = []
+            for t in _export_rows(current_user.id):
+                batch.append(orjson.dumps({
+                    "id": t.id,
+                    "date": t.transaction_date.isoformat(),
+                    "description": t.description,
+                    "amount": t.amount,
+                    "type": t.transaction_type,
+                    "category": t.category.name if t.category else None
+                }))
+                if len(batch) == EXPORT_BATCH_SIZE:
+                    yield prefix + b",".join(batch)
+                    prefix = b","
+                    batch = []
+            if batch:
+                yield prefix + b",".join(batch) + b"]"
+            else:
+                yield b"[]" if prefix == b"[" else b"]"
+        
+        return StreamingResponse(iter_json(), media_type="application/json")
     
     else:  # CSV format
-        import io
-        import csv
-        from fastapi.responses import StreamingResponse
-        
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Header
-        writer.writerow(["Date", "Description", "Amount", "Type", "Category"])
-        
-        # Data
-        for t in transactions:
-            writer.writerow([
-                t.transaction_date.strftime('%Y-%m-%d'),
-                t.description,
-                t.amount,
-                t.transaction_type,
-                t.category.name if t.category else ""
-            ])
-        
-        output.seek(0)
+        def iter_csv():
+            output = io.StringIO()
+            writer = csv.writer(output)
+            
+            # Header
+            writer.writerow(["Date", "Description", "Amount", "Type", "Category"])
+            
+            # Data - flushed to the client every EXPORT_BATCH_SIZE rows
+            for i, t in enumerate(_export_rows(current_user.id), 1):
+                writer.writerow([
+                    t.transaction_date.strftime('%Y-%m-%d'),
+                    t.description,
+                    t.amount,
+                    t.transaction_type,
+                    t.category.name if t.category else ""
+                ])
+                if i % EXPORT_BATCH_SIZE == 0:
+                    yield output.getvalue().encode()
+                    output.seek(0)
+                    output.truncate()
+            
+            yield output.getvalue().encode()
         
         return StreamingResponse(
-            io.BytesIO(output.getvalue().encode()),
+            iter_csv(),
             media_type="text/csv",
             headers={"Content-Disposition": "attachment; filename=transactions.csv"}
         )
@@ -816,15 +939,7 @@ def get_budgets_status(
         models.Budget.is_active == True
     ).all()
     
-    budget_service = BudgetService(db)
-    statuses = []
-    
-    for budget in budgets:
-        status = budget_service.get_budget_status(budget.id)
-        if status:
-            statuses.append(status)
-    
-    return statuses
+    return budget_service.get_budgets_status(db, budgets)
 
 @router.get("/alerts/", response_model=List[schemas.AlertResponse])
 def get_alerts(
@@ -857,9 +972,22 @@ def mark_alert_read(
     
     raise HTTPException(status_code=404, detail="Alert not found")
 
+@router.post("/alerts/read")
+def mark_alerts_read(
+    request: schemas.AlertReadRequest,
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Mark several alerts as read in one request"""
+    count = db.query(models.Alert).filter(
+        models.Alert.id.in_(request.ids),
+        models.Alert.user_id == current_user.id,
+        models.Alert.is_read == False
+    ).update({models.Alert.is_read: True}, synchronize_session=False)
+    db.commit()
+    
+    return {"message": f"{count} alerts marked as read", "count": count}
 
-# Import prediction service at the top
-from ..services.prediction_service import PredictionService
 
 # Prediction Endpoints
 @router.get("/predictions/monthly")
@@ -868,8 +996,7 @@ def get_monthly_predictions(
     db: Session = Depends(get_db)
 ):
     """Get monthly spending predictions"""
-    prediction_service = PredictionService(db)
-    predictions = prediction_service.predict_monthly_spending(current_user.id)
+    predictions = prediction_service.predict_monthly_spending(db, current_user.id)
     return predictions
 
 @router.get("/predictions/category")
@@ -879,8 +1006,7 @@ def get_category_predictions(
     db: Session = Depends(get_db)
 ):
     """Get spending predictions by category"""
-    prediction_service = PredictionService(db)
-    predictions = prediction_service.predict_category_spending(current_user.id, days)
+    predictions = prediction_service.predict_category_spending(db, current_user.id, days)
     return predictions
 
 @router.get("/predictions/insights")
@@ -889,10 +1015,29 @@ def get_ai_insights(
     db: Session = Depends(get_db)
 ):
     """Get AI-powered spending insights and predictions"""
-    prediction_service = PredictionService(db)
-    insights = prediction_service.get_spending_insights(current_user.id)
+    insights = prediction_service.get_spending_insights(db, current_user.id)
     return insights
 
+# Dashboard Endpoint
+@router.get("/dashboard/bundle")
+def get_dashboard_bundle(
+    current_user: models.User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get every dashboard section in one response (one auth check, one session)"""
+    budgets = db.query(models.Budget).filter(
+        models.Budget.user_id == current_user.id,
+        models.Budget.is_active == True
+    ).all()
+
+    return {
+        "insights": analytics_service.get_insights(db, current_user.id),
+        "spending_by_category": analytics_service.get_spending_by_category(db, current_user.id),
+        "monthly_trend": analytics_service.get_monthly_trend(db, current_user.id),
+        "predictions": prediction_service.get_spending_insights(db, current_user.id),
+        "budget_statuses": budget_service.get_budgets_status(db, budgets)
+    }
+
 
 
 # Initialize receipt parser
@@ -911,19 +1056,21 @@ async def upload_receipt(
         detail="Receipt OCR is temporarily disabled in production deployment"
     )
 # @router.post("/transactions/upload-receipt")
-# async def upload_receipt(
+# def upload_receipt(
 #     file: UploadFile = File(...),
 #     current_user: models.User = Depends(get_current_user),
 #     db: Session = Depends(get_db)
 # ):
 #     """Upload and parse receipt image"""
+#     # Sync handler: FastAPI runs it on the worker threadpool, so the
+#     # seconds-long Tesseract call never blocks the event loop
 #     # Validate file type
 #     if not file.content_type.startswith('image/'):
 #         raise HTTPException(status_code=400, detail="Please upload an image file")
     
 #     try:
-#         # Read image
-#         contents = await file.read()
+#         # Read image (already spooled by Starlette)
+#         contents = file.file.read()
         
 #         # Parse receipt
 #         result = receipt_parser.parse_receipt(contents)
@@ -938,24 +1085,18 @@ async def upload_receipt(
 #         merchant = result.get('merchant', 'Receipt Transaction')
 #         category_name, confidence = categorizer.predict(merchant)
         
-#         # Find or create category
-#         category = db.query(models.Category).filter(
-#             models.Category.name == category_name,
-#             models.Category.user_id == current_user.id
-#         ).first()
-        
-#         if not category:
-#             category = db.query(models.Category).filter(
-#                 models.Category.name == "Others",
-#                 models.Category.user_id == current_user.id
-#             ).first()
+#         # Find category (cached), falling back to "Others"
+#         category_id = (
+#             _category_id(db, current_user.id, category_name)
+#             or _category_id(db, current_user.id, "Others")
+#         )
         
 #         # Create transaction
 #         transaction = models.Transaction(
 #             user_id=current_user.id,
 #             amount=result['amount'],
 #             description=f"{merchant} - Receipt",
-#             category_id=category.id if category else None,
+#             category_id=category_id,
 #             transaction_type='expense',
 #             transaction_date=datetime.now(),  # Could parse from receipt if available
 #             source='receipt_ocr',
@@ -967,9 +1108,8 @@ async def upload_receipt(
 #         db.refresh(transaction)
         
 #         # Check budget
-#         if category:
-#             budget_service = BudgetService(db)
-#             alert = budget_service.check_budget_alert(current_user.id, category.id)
+#         if category_id:
+#             alert = budget_service.check_budget_alert(db, current_user.id, category_id)
         
 #         return {
 #             "transaction_id": transaction.id,
@@ -1019,8 +1159,7 @@ def convert_currency(
     current_user: models.User = Depends(get_current_user)
 ):
     """Convert amount between currencies"""
-    converted = currency_service.convert_currency(amount, from_currency, to_currency)
-    rate = currency_service.get_exchange_rates(from_currency).get(to_currency, 1.0)
+    converted, rate = currency_service.quote(amount, from_currency, to_currency)
     
     return {
         "original_amount": amount,
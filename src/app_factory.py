@@ -0,0 +1,126 @@
+import logging
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from anyio import to_thread
+from fastapi import Depends, FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
+
+from .config import API_TITLE, API_VERSION, API_PREFIX, RUN_DDL_ON_STARTUP, CORS_ORIGINS, LOG_LEVEL
+
+PROFILES = ("full", "simple")
+
+# Static bodies are serialized once and the same response is returned per call
+HEALTH_RESPONSE = ORJSONResponse({"status": "healthy"})
+ROOT_RESPONSES = {
+    "full": ORJSONResponse({
+        "message": "AI Finance Assistant API",
+        "documentation": "/docs",
+        "health": "/health",
+        "version": API_VERSION
+    }),
+    "simple": ORJSONResponse({"message": "AI Finance Assistant API is running!"}),
+}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create database tables once per process, release the pool on shutdown"""
+    from .database.database import engine, warm_pool, DB_POOL_SIZE, DB_MAX_OVERFLOW
+    from .database import models
+
+    # Sync routes and get_db run on AnyIO worker threads; match that pool to
+    # the DB pool so requests queue for a thread instead of a connection
+    to_thread.current_default_thread_limiter().total_tokens = DB_POOL_SIZE + DB_MAX_OVERFLOW
+    if RUN_DDL_ON_STARTUP:
+        models.Base.metadata.create_all(bind=engine)
+    warm_pool()
+    yield
+    engine.dispose()
+
+
+@lru_cache
+def create_app(profile: str = "full") -> FastAPI:
+    """Build the FastAPI app for a profile.
+
+    "full" serves the whole API under /api/v1 backed by the database,
+    "simple" serves only the static status endpoints.
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown app profile: {profile}")
+    
+    # Application loggers live under "src"; below LOG_LEVEL the calls return
+    # before any message formatting happens
+    logging.basicConfig(format="%(levelname)s:     %(name)s - %(message)s")
+    logging.getLogger("src").setLevel(LOG_LEVEL)
+
+    if profile == "full":
+        app = FastAPI(
+            title=API_TITLE,
+            description="Backend API for AI-powered personal finance management",
+            version=API_VERSION,
+            docs_url="/docs",
+            redoc_url="/redoc",
+            default_response_class=ORJSONResponse,
+            lifespan=lifespan
+        )
+    else:
+        app = FastAPI(
+            title=API_TITLE,
+            description="Backend API for personal finance management",
+            version=API_VERSION,
+            default_response_class=ORJSONResponse
+        )
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=sorted(CORS_ORIGINS),
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        max_age=86400,
+    )
+    # Compress list payloads (transactions, exports); small bodies go out as-is
+    app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+    if profile == "full":
+        from sqlalchemy import text
+        from sqlalchemy.orm import Session
+        from sqlalchemy.pool import QueuePool
+        from .api.routes import router
+        from .database.database import engine, get_db, DB_POOL_SIZE, DB_MAX_OVERFLOW
+        app.include_router(router, prefix=API_PREFIX)
+
+        @app.get("/ready")
+        def ready(db: Session = Depends(get_db)):
+            """Readiness probe - pings the database (liveness uses /health)"""
+            pool = engine.pool
+            if isinstance(pool, QueuePool) and pool.checkedout() >= DB_POOL_SIZE + DB_MAX_OVERFLOW:
+                return ORJSONResponse({"ready": False, "reason": "connection pool exhausted"}, status_code=503)
+            try:
+                db.execute(text("SELECT 1"))
+            except Exception as e:
+                return ORJSONResponse({"ready": False, "reason": str(e)}, status_code=503)
+            return {"ready": True}
+    else:
+        @app.get(f"{API_PREFIX}/test")
+        def test():
+            return {"message": "API endpoint working!"}
+
+    root_response = ROOT_RESPONSES[profile]
+
+    # async so the constant responses skip the worker-thread hop
+    @app.get("/")
+    async def root():
+        return root_response
+
+    # Liveness probe - never touches the database
+    @app.get("/health")
+    async def health():
+        return HEALTH_RESPONSE
+
+    # Build the OpenAPI schema now; FastAPI reuses app.openapi_schema on /docs
+    app.openapi_schema = app.openapi()
+
+    return app
@@ -0,0 +1,23 @@
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# API metadata
+API_TITLE = "AI Finance Assistant API"
+API_VERSION = "1.0.0"
+API_PREFIX = "/api/v1"
+
+# Set RUN_DDL_ON_STARTUP=false where the schema is managed by migrations
+RUN_DDL_ON_STARTUP = os.getenv("RUN_DDL_ON_STARTUP", "true").lower() == "true"
+
+# Comma-separated browser origins allowed to call the API
+# (production: the Streamlit app URL, development: http://localhost:8501)
+CORS_ORIGINS = frozenset(
+    origin.strip()
+    for origin in os.getenv("CORS_ORIGINS", "http://localhost:8501").split(",")
+    if origin.strip()
+)
+
+# Log level for the application loggers (DEBUG shows per-request auth traces)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "WARNING").upper()
@@ -1,29 +1,99 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.ext.declarative import declarative_base
+import logging
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # For development, we'll use SQLite
 SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./finance.db")
 
 # Create Base here to avoid circular imports
 Base = declarative_base()
 
+# Connection pool settings (PostgreSQL)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Connections each worker opens at startup; every worker warms its own pool,
+# so keep workers x this well under the server's max_connections
+DB_WARM_CONNECTIONS = int(os.getenv("DB_WARM_CONNECTIONS", "2"))
+
+_url = make_url(SQLALCHEMY_DATABASE_URL)
+
 # For SQLite
-if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
+if _url.drivername.startswith("sqlite"):
+    if _url.database in (None, "", ":memory:"):
+        # In-memory databases live on a single connection per thread
+        engine = create_engine(
+            SQLALCHEMY_DATABASE_URL, 
+            connect_args={"check_same_thread": False}
+        )
+    else:
+        # File databases get a QueuePool; size it like PostgreSQL so it
+        # matches the worker-thread limit instead of the 5+10 default
+        engine = create_engine(
+            SQLALCHEMY_DATABASE_URL, 
+            connect_args={"check_same_thread": False},
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT
+        )
+
+        @event.listens_for(engine, "connect")
+        def _set_sqlite_pragmas(dbapi_connection, connection_record):
+            """WAL lets readers run alongside a writer; NORMAL sync skips the
+            per-commit fsync (still durable at checkpoints); bigger page cache
+            and mmap cut I/O for the analytics queries"""
+            cursor = dbapi_connection.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute("PRAGMA temp_store=MEMORY")
+            cursor.execute("PRAGMA mmap_size=268435456")
+            cursor.execute("PRAGMA cache_size=-65536")
+            cursor.close()
+else:
+    # For PostgreSQL - keep warm connections and drop dead ones before use
     engine = create_engine(
-        SQLALCHEMY_DATABASE_URL, 
-        connect_args={"check_same_thread": False}
+        SQLALCHEMY_DATABASE_URL,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=True
     )
-else:
-    # For PostgreSQL
-    engine = create_engine(SQLALCHEMY_DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Thread-local session for scripts; call ScopedSession.remove() when done
+ScopedSession = scoped_session(SessionLocal)
+
+def warm_pool():
+    """Open a few pooled connections up front so early requests skip connect/auth.
+
+    Best-effort: a refused connection (e.g. max_connections reached) is logged
+    and ends the warm-up instead of failing application startup.
+    """
+    if not isinstance(engine.pool, QueuePool):
+        return
+    # Hold them all at once, otherwise the pool hands back the same connection
+    connections = []
+    try:
+        for _ in range(min(engine.pool.size(), DB_WARM_CONNECTIONS)):
+            connections.append(engine.connect())
+    except Exception as e:
+        logger.warning("Pool warm-up stopped after %d connections: %s", len(connections), e)
+    finally:
+        for connection in connections:
+            connection.close()
+
 def get_db():
     db = SessionLocal()
     try:
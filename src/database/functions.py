@@ -0,0 +1,38 @@
+from sqlalchemy import DateTime, String
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+
+class year_month(FunctionElement):
+    """Calendar month of a datetime column as a 'YYYY-MM' string, computed in SQL"""
+    type = String()
+    inherit_cache = True
+    name = "year_month"
+
+
+@compiles(year_month)
+def _year_month_default(element, compiler, **kw):
+    return "to_char(%s, 'YYYY-MM')" % compiler.process(element.clauses, **kw)
+
+
+@compiles(year_month, "sqlite")
+def _year_month_sqlite(element, compiler, **kw):
+    return "strftime('%%Y-%%m', %s)" % compiler.process(element.clauses, **kw)
+
+
+class utc_now(FunctionElement):
+    """Current UTC time as a naive timestamp, for DateTime column defaults"""
+    type = DateTime()
+    inherit_cache = True
+    name = "utc_now"
+
+
+@compiles(utc_now)
+def _utc_now_default(element, compiler, **kw):
+    # now() is in the session time zone; shift it to UTC for the naive column
+    return "timezone('utc', now())"
+
+
+@compiles(utc_now, "sqlite")
+def _utc_now_sqlite(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"  # Already UTC
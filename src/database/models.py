@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, Index
 from sqlalchemy.orm import relationship
-from datetime import datetime
 from .database import Base  # Make sure this import is correct
+from .functions import utc_now
 
 class User(Base):
     __tablename__ = "users"
@@ -11,11 +11,17 @@ class User(Base):
     username = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    # Timestamps come from the database (in UTC), not a per-row Python call
+    created_at = Column(DateTime, server_default=utc_now())
     
     transactions = relationship("Transaction", back_populates="user", cascade="all, delete-orphan")
     categories = relationship("Category", back_populates="user", cascade="all, delete-orphan")
 
+def _amount_in_inr(context):
+    """Column default: INR value from the row's amount and exchange rate"""
+    params = context.get_current_parameters()
+    return params["amount"] * (params.get("exchange_rate") or 1.0)
+
 # Add to the Transaction model (update the existing class)
 class Transaction(Base):
     __tablename__ = "transactions"
@@ -24,7 +30,8 @@ class Transaction(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     amount = Column(Float, nullable=False)
     currency = Column(String, default="INR")  # Add this line
-    amount_inr = Column(Float)  # Add this line - stores INR equivalent
+    # INR equivalent, always written so aggregates sum this one column
+    amount_inr = Column(Float, default=_amount_in_inr)
     exchange_rate = Column(Float, default=1.0)  # Add this line
     description = Column(Text)
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=True)
@@ -32,10 +39,17 @@ class Transaction(Base):
     transaction_type = Column(String, nullable=False)
     source = Column(String)
     raw_text = Column(Text)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utc_now())
     
     user = relationship("User", back_populates="transactions")
-    category = relationship("Category", back_populates="transactions")
+    # Responses always include the category; selectin loads it for a whole
+    # result set in one extra query instead of one per row
+    category = relationship("Category", back_populates="transactions", lazy="selectin")
+
+# Newest-first listing of one user's transactions reads straight off this index
+Index("ix_transactions_user_date", Transaction.user_id, Transaction.transaction_date.desc())
+# Per-category date ranges: budget spend, category queries and breakdowns
+Index("ix_transactions_user_category_date", Transaction.user_id, Transaction.category_id, Transaction.transaction_date)
 
 # Add a new Currency Settings model
 class CurrencySettings(Base):
@@ -72,12 +86,15 @@ class Budget(Base):
     period = Column(String, default="monthly")  # monthly/weekly/yearly
     alert_threshold = Column(Float, default=0.8)  # Alert at 80% by default
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utc_now())
+    updated_at = Column(DateTime, server_default=utc_now(), onupdate=utc_now())
     
     # Relationships
     user = relationship("User", backref="budgets")
-    category = relationship("Category", backref="budgets")
+    category = relationship("Category", backref="budgets", lazy="selectin")
+
+# Active-budget lookups are always by user (and usually category)
+Index("ix_budgets_user_category", Budget.user_id, Budget.category_id)
 
 class Alert(Base):
     __tablename__ = "alerts"
@@ -88,8 +105,11 @@ class Alert(Base):
     title = Column(String, nullable=False)
     message = Column(Text, nullable=False)
     is_read = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, server_default=utc_now())
     
     # Relationships
     user = relationship("User", backref="alerts")
 
+# Backs the newest-first alerts feed
+Index("ix_alerts_user_created", Alert.user_id, Alert.created_at.desc())
+
@@ -126,3 +126,6 @@ class AlertResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+class AlertReadRequest(BaseModel):
+    ids: List[int]
@@ -1,11 +1,15 @@
 import pickle
+from functools import lru_cache
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.naive_bayes import MultinomialNB
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.linear_model import SGDClassifier
 from sklearn.pipeline import Pipeline
 from typing import List, Tuple
 import os
 
+# Predictions kept per description (merchant strings repeat heavily)
+PREDICT_CACHE_SIZE = 10000
+
 class TransactionCategorizer:
     """ML-based transaction categorization system"""
     
@@ -105,7 +109,9 @@ class TransactionCategorizer:
             ("supermarket", "Groceries"),
         ]
         
-        self.model_path = "data/models/categorizer.pkl"
+        # Hashing pipeline; older TF-IDF pickles under categorizer.pkl are not reused
+        self.model_path = "data/models/categorizer_hashing.pkl"
+        self._predict_cached = lru_cache(maxsize=PREDICT_CACHE_SIZE)(self._predict_one)
         self._initialize_model()
 
     
@@ -121,19 +127,28 @@ class TransactionCategorizer:
         # Prepare training data
         descriptions, categories = zip(*self.training_data)
         
-        # Create pipeline with TF-IDF and Naive Bayes
+        # Create pipeline with hashed TF-IDF and a logistic-loss linear model;
+        # hashing needs no vocabulary lookup and emits float32 features
         self.model = Pipeline([
-            ('tfidf', TfidfVectorizer(
+            ('vectorizer', HashingVectorizer(
                 lowercase=True,
                 stop_words='english',
                 ngram_range=(1, 2),
-                max_features=1000
+                n_features=2 ** 14,
+                alternate_sign=False,
+                norm=None,
+                dtype=np.float32
             )),
-            ('classifier', MultinomialNB())
+            ('tfidf', TfidfTransformer()),
+            ('classifier', SGDClassifier(loss='log_loss', random_state=0))
         ])
         
         # Train model
         self.model.fit(descriptions, categories)
+        # Only hash buckets seen in training get non-zero weights; storing the
+        # coefficients sparse shrinks the pickle ~4x with identical predictions
+        self.model.named_steps['classifier'].sparsify()
+        self._predict_cached.cache_clear()
         
         # Save model
         self.save_model()
@@ -147,15 +162,13 @@ class TransactionCategorizer:
         if not description:
             description = "Unknown Transaction"
         
-        # Ensure description is a string
-        description = str(description)
-        
-        # Get prediction and probability
-        category = self.model.predict([description])[0]
-        probabilities = self.model.predict_proba([description])[0]
-        confidence = max(probabilities)
-        
-        return category, confidence
+        # Cache on a normalised key; the vectorizer lowercases and tokenises
+        # anyway, so case and spacing variants share one prediction
+        return self._predict_cached(" ".join(str(description).lower().split()))
+    
+    def _predict_one(self, description: str) -> Tuple[str, float]:
+        """Uncached single prediction behind predict"""
+        return self.predict_batch([description])[0]
 
     
     def predict_batch(self, descriptions: List[str]) -> List[Tuple[str, float]]:
@@ -163,15 +176,18 @@ class TransactionCategorizer:
         if not self.model:
             self.train()
         
-        predictions = self.model.predict(descriptions)
-        probabilities = self.model.predict_proba(descriptions)
+        descriptions = [str(d) if d else "Unknown Transaction" for d in descriptions]
+        if not descriptions:
+            return []
         
-        results = []
-        for pred, probs in zip(predictions, probabilities):
-            confidence = max(probs)
-            results.append((pred, confidence))
+        # One vectorizer transform and one predict_proba for the whole batch.
+        # Features, IDF weights and SGD coefficients are all float32, so the
+        # sparse matmul never upcasts; the predicted class is the most probable
+        probabilities = self.model.predict_proba(descriptions)
+        labels = self.model.classes_[probabilities.argmax(axis=1)]
+        confidences = probabilities.max(axis=1)
         
-        return results
+        return list(zip(labels.tolist(), confidences.tolist()))
     
     def save_model(self):
         """Save the trained model"""
@@ -183,6 +199,7 @@ class TransactionCategorizer:
         """Load a saved model"""
         with open(self.model_path, 'rb') as f:
             self.model = pickle.load(f)
+        self._predict_cached.cache_clear()
     
     def add_training_data(self, description: str, category: str):
         """Add new training example and retrain"""
@@ -1,38 +1,50 @@
-import PyPDF2
 import re
 from typing import List, Dict
-import tabula
 import pandas as pd
 
+# Thousands separators and currency markers around statement amounts
+AMOUNT_NOISE_RE = re.compile(r'[,₹]|Rs\.?')
+
 class PDFStatementParser:
     """Parse bank statements from PDF files"""
     
     def __init__(self):
+        # Compiled once; text statements are scanned line by line
         self.transaction_patterns = {
-            'date': r'(\d{2}[-/]\d{2}[-/]\d{4})',
-            'description': r'[A-Za-z\s]+',
-            'amount': r'[\d,]+\.?\d*',
-            'balance': r'[\d,]+\.?\d*'
+            'date': re.compile(r'(\d{2}[-/]\d{2}[-/]\d{4})'),
+            'description': re.compile(r'[A-Za-z\s]+'),
+            'amount': re.compile(r'[\d,]+\.?\d*'),
+            'balance': re.compile(r'[\d,]+\.?\d*')
         }
     
     def extract_text_from_pdf(self, pdf_path: str) -> str:
-        """Extract raw text from PDF"""
-        text = ""
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page in pdf_reader.pages:
-                text += page.extract_text()
-        return text
+        """Extract raw text from PDF using MuPDF"""
+        import pymupdf  # imported lazily so a missing PDF library only breaks PDF uploads
+
+        with pymupdf.open(pdf_path) as doc:
+            return "\n".join(page.get_text() for page in doc)
     
     def extract_tables_from_pdf(self, pdf_path: str) -> List[pd.DataFrame]:
-        """Extract tables from PDF using tabula"""
+        """Extract tables from PDF using pdfplumber (first row is the header)"""
+        import pdfplumber
+
         try:
-            tables = tabula.read_pdf(pdf_path, pages='all', multiple_tables=True)
-            return tables
+            with pdfplumber.open(pdf_path) as pdf:
+                return [
+                    pd.DataFrame(table[1:], columns=self._header(table[0]))
+                    for page in pdf.pages
+                    for table in page.extract_tables()
+                    if len(table) > 1
+                ]
         except Exception as e:
             print(f"Error extracting tables: {e}")
             return []
     
+    @staticmethod
+    def _header(row: List) -> List[str]:
+        """Column names from a header row; cells may be empty or wrap lines"""
+        return [" ".join(str(cell or f"column_{i}").split()) for i, cell in enumerate(row)]
+    
     def parse_statement(self, pdf_path: str) -> pd.DataFrame:
         """Main method to parse bank statement"""
         
@@ -70,11 +82,14 @@ class PDFStatementParser:
         if 'date' in df.columns:
             df['date'] = pd.to_datetime(df['date'], errors='coerce')
         
-        # Convert amount columns
-        for col in ['debit', 'credit', 'amount', 'balance']:
-            if col in df.columns:
-                df[col] = df[col].astype(str).str.replace(',', '').str.replace('Rs.', '')
-                df[col] = pd.to_numeric(df[col], errors='coerce')
+        # Convert amount columns, stripping separators and currency in one pass
+        amount_cols = [col for col in ['debit', 'credit', 'amount', 'balance'] if col in df.columns]
+        if amount_cols:
+            df[amount_cols] = (
+                df[amount_cols].astype(str)
+                .replace(AMOUNT_NOISE_RE, '', regex=True)
+                .apply(pd.to_numeric, errors='coerce')
+            )
         
         return df
     
@@ -82,10 +97,11 @@ class PDFStatementParser:
         """Parse transactions from raw text"""
         lines = text.split('\n')
         transactions = []
+        date_pattern = self.transaction_patterns['date']
         
         for line in lines:
             # Look for transaction patterns
-            if re.search(self.transaction_patterns['date'], line):
+            if date_pattern.search(line):
                 transaction = self._extract_transaction_from_line(line)
                 if transaction:
                     transactions.append(transaction)
@@ -96,8 +112,8 @@ class PDFStatementParser:
         """Extract transaction details from a text line"""
         # Implementation depends on specific bank format
         # This is a simplified version
-        date_match = re.search(self.transaction_patterns['date'], line)
-        amount_matches = re.findall(r'[\d,]+\.?\d*', line)
+        date_match = self.transaction_patterns['date'].search(line)
+        amount_matches = self.transaction_patterns['amount'].findall(line)
         
         if date_match and amount_matches:
             return {
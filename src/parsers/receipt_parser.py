@@ -1,56 +1,64 @@
 import cv2
+import os
 import pytesseract
 import numpy as np
-from PIL import Image
 import re
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
-import io
 
 # Set Tesseract path for Windows
 pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 
+# LSTM engine only, single text block, no inverted-image retry pass
+TESSERACT_CONFIG = '--oem 1 --psm 6 -c tessedit_do_invert=0 -l eng'
+# Receipts OCR'd at once by parse_receipts; each runs its own tesseract process
+OCR_CONCURRENCY = int(os.getenv("OCR_CONCURRENCY", str(os.cpu_count() or 1)))
+
 class ReceiptParser:
     """OCR-based receipt parser"""
     
     def __init__(self):
-        self.amount_patterns = [
+        # Patterns are compiled once with their flags; OCR text is scanned per line
+        amount_patterns = [
             r'TOTAL[\s:]+(?:Rs\.?|₹)?\s*([\d,]+\.?\d*)',
             r'Grand\s*Total[\s:]+(?:Rs\.?|₹)?\s*([\d,]+\.?\d*)',
             r'Amount[\s:]+(?:Rs\.?|₹)?\s*([\d,]+\.?\d*)',
             r'(?:Rs\.?|₹)\s*([\d,]+\.?\d*)',
-            r'([\d,]+\.?\d*)\s*(?:Rs\.?|₹)',
+            r'([\d,]+\.?\d*)(?=\s*(?:Rs\.?|₹))',  # Lookahead leaves the symbol for the next amount
             r'\b(\d{1,6}(?:,\d{3})*(?:\.\d{2})?)\b'  # General number pattern
         ]
+        # One alternation so extract_amount walks the text once, not per pattern
+        self.amount_pattern = re.compile(
+            "|".join(f"(?:{p})" for p in amount_patterns), re.IGNORECASE | re.MULTILINE
+        )
         
-        self.merchant_patterns = [
+        self.merchant_patterns = [re.compile(p, re.MULTILINE) for p in [
             r'^([A-Z][A-Z\s&\-\.]{2,})$',  # All caps line at start
             r'(?:From|Merchant|Store|Restaurant)[\s:]+([A-Za-z\s&\-\.]+)',
             r'([A-Z][A-Za-z\s&\-\.]{3,})\s*\n'  # Title case at line start
-        ]
+        ]]
         
-        self.date_patterns = [
+        self.date_patterns = [re.compile(p) for p in [
             r'(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})',
             r'(\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{2,4})',
             r'Date[\s:]+(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})'
-        ]
+        ]]
+        
+        # Item lines: item name followed by price
+        self.item_pattern = re.compile(r'(.+?)\s+(\d+(?:\.\d{2})?)\s*$')
     
     def preprocess_image(self, image_bytes: bytes) -> np.ndarray:
         """Preprocess image for better OCR accuracy"""
-        # Convert bytes to image
-        image = Image.open(io.BytesIO(image_bytes))
-        # Convert to OpenCV format
-        img = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-        
-        # Convert to grayscale
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        # Decode straight to a single grayscale channel (no RGB copy or colour conversions)
+        gray = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            raise ValueError("Unsupported or corrupt image")
         
-        # Apply thresholding to get better OCR results
-        _, thresh = cv2.threshold(gray, 150, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        # Apply Otsu thresholding in place to get better OCR results
+        cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU, dst=gray)
         
         # Denoise
-        denoised = cv2.medianBlur(thresh, 3)
-        
-        return denoised
+        return cv2.medianBlur(gray, 3)
     
     def extract_text_from_image(self, image_bytes: bytes) -> str:
         """Extract text from receipt image using OCR"""
@@ -59,7 +67,7 @@ class ReceiptParser:
             processed_img = self.preprocess_image(image_bytes)
             
             # Perform OCR
-            text = pytesseract.image_to_string(processed_img, config='--psm 6')
+            text = pytesseract.image_to_string(processed_img, config=TESSERACT_CONFIG)
             
             return text
         except Exception as e:
@@ -68,22 +76,23 @@ class ReceiptParser:
     
     def extract_amount(self, text: str) -> Optional[float]:
         """Extract total amount from receipt text"""
-        amounts_found = []
-        
-        for pattern in self.amount_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE | re.MULTILINE)
-            for match in matches:
-                try:
-                    # Clean and convert amount
-                    amount_str = match.replace(',', '')
-                    amount = float(amount_str)
-                    if 10 <= amount <= 100000:  # Reasonable amount range
-                        amounts_found.append(amount)
-                except ValueError:
-                    continue
-        
-        # Return the largest amount (usually the total)
-        return max(amounts_found) if amounts_found else None
+        # Keep a running maximum - the largest amount is usually the total.
+        # Each number is matched whole, so an out-of-range lakh-grouped total
+        # is skipped rather than read as its tail: "Amount: 12,34,567.00" and
+        # "Total Rs 1,50,000" give None, not 34567.0 / 50000.0
+        largest = None
+        
+        for match in self.amount_pattern.finditer(text):
+            # Exactly one alternative matched, so its group is the last one set
+            try:
+                # Clean and convert amount
+                amount = float(match.group(match.lastindex).replace(',', ''))
+            except ValueError:
+                continue
+            if 10 <= amount <= 100000 and (largest is None or amount > largest):  # Reasonable amount range
+                largest = amount
+        
+        return largest
     
     def extract_merchant(self, text: str) -> Optional[str]:
         """Extract merchant name from receipt"""
@@ -98,7 +107,7 @@ class ReceiptParser:
         
         # Try patterns
         for pattern in self.merchant_patterns:
-            match = re.search(pattern, text, re.MULTILINE)
+            match = pattern.search(text)
             if match:
                 return match.group(1).strip().title()
         
@@ -109,11 +118,8 @@ class ReceiptParser:
         items = []
         lines = text.split('\n')
         
-        # Pattern for item lines (item name followed by price)
-        item_pattern = r'(.+?)\s+(\d+(?:\.\d{2})?)\s*$'
-        
         for line in lines:
-            match = re.match(item_pattern, line.strip())
+            match = self.item_pattern.match(line.strip())
             if match:
                 item_name = match.group(1).strip()
                 price = float(match.group(2))
@@ -145,7 +151,7 @@ class ReceiptParser:
         # Try to extract date
         date = None
         for pattern in self.date_patterns:
-            match = re.search(pattern, text)
+            match = pattern.search(text)
             if match:
                 date = match.group(1)
                 break
@@ -158,3 +164,11 @@ class ReceiptParser:
             'items': items,
             'raw_text': text
         }
+    
+    def parse_receipts(self, images: List[bytes]) -> List[Dict]:
+        """Parse several receipts concurrently, results in input order"""
+        if len(images) <= 1:
+            return [self.parse_receipt(image) for image in images]
+        
+        with ThreadPoolExecutor(max_workers=min(OCR_CONCURRENCY, len(images))) as executor:
+            return list(executor.map(self.parse_receipt, images))
@@ -1,8 +1,24 @@
 import re
-from datetime import datetime
+from datetime import date, datetime
+from functools import lru_cache
 from typing import Dict, Optional, List
 import pandas as pd
 
+# Parsed results kept per exact SMS text (bank templates and retries repeat)
+SMS_CACHE_SIZE = 10000
+# Normalised dates kept per raw date string
+DATE_CACHE_SIZE = 4096
+
+# Date layouts seen in bank SMS. No string matches two of them (%Y needs four
+# digits, %y two; %b/%B match any case), so the order they are tried in is free
+DATE_FORMATS = (
+    '%d-%m-%Y', '%d/%m/%Y', '%d-%m-%y', '%d/%m/%y',
+    '%d %B %Y', '%d %b %Y', '%d %B %y', '%d %b %y',
+    '%d-%b-%y', '%d-%B-%y', '%d-%b-%Y', '%d-%B-%Y',
+)
+# The numeric layouts above (same separator twice, 2- or 4-digit year)
+NUMERIC_DATE_RE = re.compile(r'(\d{1,2})([-/])(\d{1,2})\2(\d{4}|\d{2})')
+
 class SMSParser:
     """Industry-level SMS parser for bank transactions"""
     
@@ -45,11 +61,45 @@ class SMSParser:
             'AED': [r'AED\s*([\d,]+\.?\d*)', r'Dhs?\s*([\d,]+\.?\d*)'],
             'INR': [r'₹\s*([\d,]+\.?\d*)', r'Rs\.?\s*([\d,]+\.?\d*)', r'INR\s*([\d,]+\.?\d*)']
         }
+        
+        # Compile every pattern once; dates are matched case-sensitively, the rest ignore case.
+        # Patterns stay separate and are tried in order: a single alternation per field
+        # would pick the leftmost match instead, and CPython's re runs it slower because
+        # it loses the literal-prefix scan each pattern gets on its own
+        for field in ('amount', 'merchant', 'card_last_digits'):
+            self.patterns[field] = [re.compile(p, re.IGNORECASE) for p in self.patterns[field]]
+        self.patterns['date'] = [re.compile(p) for p in self.patterns['date']]
+        self.currency_patterns = {
+            currency: [re.compile(p, re.IGNORECASE) for p in patterns]
+            for currency, patterns in self.currency_patterns.items()
+        }
+        # Type keywords flattened in priority order (every debit keyword before any
+        # credit one). Substring checks on the lowered text stay: a caseless regex
+        # alternation measured ~2.5x slower than lower() plus plain `in` tests
+        self._type_keywords = tuple(
+            (keyword, trans_type)
+            for trans_type, keywords in self.patterns['type'].items()
+            for keyword in keywords
+        )
+        # Per-instance caches; parsing is a pure function of the text. They are keyed
+        # on the exact text, not a per-template fingerprint: a regex derived from one
+        # message's spans can't reproduce the ordered first-match rules above once the
+        # merchant, amount or date changes (e.g. a merchant containing " on ")
+        self._parse_cached = lru_cache(maxsize=SMS_CACHE_SIZE)(self._parse_sms)
+        self._parse_date_cached = lru_cache(maxsize=DATE_CACHE_SIZE)(self._parse_date)
+        # Format that parsed the previous date; a bank's messages share one
+        self._last_date_format = DATE_FORMATS[0]
 
         
     def parse_sms(self, sms_text: str) -> Dict[str, Optional[str]]:
         """Parse a single SMS and extract transaction details"""
-        
+        # Copy so callers can't modify the cached result
+        return dict(self._parse_cached(sms_text))
+    
+    def _parse_sms(self, sms_text: str) -> Dict[str, Optional[str]]:
+        """Uncached parse behind parse_sms"""
+        # Time here is spent inside the (C) regex searches, not in this Python
+        # orchestration, so compiling the function (Cython/mypyc) would gain little
         result = {
             'amount': None,
             'currency': 'INR',  # Add currency field
@@ -60,98 +110,120 @@ class SMSParser:
             'raw_text': sms_text
         }
         
-        # Extract currency and amount
-        currency, amount = self.extract_currency_and_amount(sms_text)
+        # Extract currency and amount. The INR amount scan runs once: it is both
+        # extract_currency_and_amount's fallback and the amount that wins below
+        currency, amount = self._extract_currency_amount(sms_text)
+        inr_amount = self._extract_inr_amount(sms_text)
+        if currency is None and inr_amount is not None:
+            currency, amount = 'INR', inr_amount
         if amount:
             result['currency'] = currency
             result['amount'] = amount
         
         # Extract amount
-        for pattern in self.patterns['amount']:
-            match = re.search(pattern, sms_text, re.IGNORECASE)
-            if match:
-                amount_str = match.group(1).replace(',', '')
-                result['amount'] = float(amount_str)
-                break
+        if inr_amount is not None:
+            result['amount'] = inr_amount
         
         # Determine transaction type
         sms_lower = sms_text.lower()
-        for trans_type, keywords in self.patterns['type'].items():
-            if any(keyword in sms_lower for keyword in keywords):
+        for keyword, trans_type in self._type_keywords:
+            if keyword in sms_lower:
                 result['type'] = trans_type
                 break
         
         # Extract merchant name
         for pattern in self.patterns['merchant']:
-            match = re.search(pattern, sms_text, re.IGNORECASE)
+            match = pattern.search(sms_text)
             if match:
                 result['merchant'] = match.group(1).strip()
                 break
         
-        # Extract card last digits
-        for pattern in self.patterns['card_last_digits']:
-            match = re.search(pattern, sms_text, re.IGNORECASE)
-            if match:
-                result['card_last_digits'] = match.group(1)
-                break
+        # Extract card last digits; every pattern needs "card" or "a/c", so messages
+        # without either skip the regexes
+        if 'card' in sms_lower or 'a/c' in sms_lower:
+            for pattern in self.patterns['card_last_digits']:
+                match = pattern.search(sms_text)
+                if match:
+                    result['card_last_digits'] = match.group(1)
+                    break
         
         # Extract date
         for pattern in self.patterns['date']:
-            match = re.search(pattern, sms_text)
+            match = pattern.search(sms_text)
             if match:
-                result['date'] = self._parse_date(match.group(1))
+                result['date'] = self._parse_date_cached(match.group(1))
                 break
         
         return result
     
     def _parse_date(self, date_str: str) -> Optional[str]:
         """Convert various date formats to standard format"""
-        date_formats = [
-            '%d-%m-%Y', '%d/%m/%Y', '%d-%m-%y', '%d/%m/%y',
-            '%d %B %Y', '%d %b %Y', '%d %B %y', '%d %b %y',
-            '%d-%b-%y', '%d-%B-%y', '%d-%b-%Y', '%d-%B-%Y',
-            '%d-DEC-23', '%d-JAN-23', '%d-FEB-23',  # Add month abbreviations
-        ]
-        
-        # Handle DD-MMM-YY format specifically
-        import re
-        if re.match(r'\d{1,2}-[A-Z]{3}-\d{2}', date_str):
+        # Numeric dates are the common case: split them instead of running strptime
+        match = NUMERIC_DATE_RE.fullmatch(date_str)
+        if match:
+            day, month, year = int(match.group(1)), int(match.group(3)), int(match.group(4))
+            if len(match.group(4)) == 2:
+                year += 2000 if year < 69 else 1900  # strptime's %y pivot
             try:
-                return datetime.strptime(date_str, '%d-%b-%y').strftime('%Y-%m-%d')
-            except:
-                pass
+                date(year, month, day)
+            except ValueError:
+                return None  # No other format accepts an all-numeric date
+            return f"{year}-{month:02d}-{day:02d}"
         
-        for fmt in date_formats:
+        # Try the last successful format first, then the rest
+        last_format = self._last_date_format
+        for fmt in (last_format,) + tuple(f for f in DATE_FORMATS if f != last_format):
             try:
-                return datetime.strptime(date_str, fmt).strftime('%Y-%m-%d')
+                parsed = datetime.strptime(date_str, fmt)
             except ValueError:
                 continue
+            self._last_date_format = fmt
+            return parsed.strftime('%Y-%m-%d')
         return None
 
     
     def parse_bulk_sms(self, sms_list: List[str]) -> pd.DataFrame:
         """Parse multiple SMS messages and return DataFrame"""
-        parsed_data = []
-        for sms in sms_list:
-            parsed_data.append(self.parse_sms(sms))
-        
-        return pd.DataFrame(parsed_data)
+        # Repeated messages are parsed once via the cache; the DataFrame copies
+        # the values, so cached dicts are read directly without a per-row copy.
+        # (Series.str.extract is no faster here: on object columns it runs the same
+        # regex per message in a Python loop, and it would bypass the cache.)
+        rows = [self._parse_cached(sms) for sms in sms_list]
+        if not rows:
+            return pd.DataFrame()
+        # Transpose to one sequence per field: pandas then builds each column
+        # directly instead of looking every key up in every row dict
+        return pd.DataFrame(dict(zip(rows[0], zip(*(row.values() for row in rows)))))
     
 
     def extract_currency_and_amount(self, text: str) -> tuple:
         """Extract currency and amount from text"""
+        currency, amount = self._extract_currency_amount(text)
+        if currency is not None:
+            return currency, amount
+        
+        # Default INR extraction if no currency symbol found
+        amount = self._extract_inr_amount(text)
+        if amount is not None:
+            return 'INR', amount
+        
+        return None, None
+    
+    def _extract_currency_amount(self, text: str) -> tuple:
+        """First currency-marked amount, or (None, None)"""
         for currency, patterns in self.currency_patterns.items():
             for pattern in patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
+                match = pattern.search(text)
                 if match:
                     amount_str = match.group(1).replace(',', '')
                     return currency, float(amount_str)
-        
-        # Default INR extraction if no currency symbol found
+        return None, None
+    
+    def _extract_inr_amount(self, text: str) -> Optional[float]:
+        """First amount matched by the plain INR amount patterns"""
         for pattern in self.patterns['amount']:
-            match = re.search(pattern, text, re.IGNORECASE)
+            match = pattern.search(text)
             if match:
                 amount_str = match.group(1).replace(',', '')
-                return 'INR', float(amount_str)
-        
-        return None, None
+                return float(amount_str)
+        return None
@@ -1,23 +1,29 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract  # Make sure func is imported here
+from sqlalchemy import func, case  # Make sure func is imported here
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Optional
 import pandas as pd
+from ..database.functions import year_month
 from ..database.models import Transaction, Category, User
 
 
 class AnalyticsService:
     """Service for financial analytics and insights"""
     
-    def __init__(self, db: Session):
-        self.db = db
-    
-    def get_spending_by_category(self, user_id: int, start_date: datetime = None, end_date: datetime = None) -> List[Dict]:
-        """Get spending breakdown by category"""
+    def _category_spending_query(self, db: Session, user_id: int, start_date: datetime = None, end_date: datetime = None):
+        """Expense totals per category, each row also carrying its share of the total.
+
+        The reduction happens entirely in SQL - one row per category comes back
+        already formatted - so there is no per-transaction work to vectorise.
+        """
+        total = func.sum(Transaction.amount_inr)
         
-        query = self.db.query(
+        query = db.query(
             Category.name,
-            func.sum(Transaction.amount).label('total')
+            total.label('total'),
+            # Window over the grouped rows: all categorised spending, before any LIMIT,
+            # so the share comes back ready-made (0 when there is no spending)
+            func.coalesce(total / func.nullif(func.sum(total).over(), 0) * 100, 0).label('percentage')
         ).join(
             Transaction
         ).filter(
@@ -30,36 +36,44 @@ class AnalyticsService:
         if end_date:
             query = query.filter(Transaction.transaction_date <= end_date)
         
-        results = query.group_by(Category.name).all()
-        
-        # Calculate percentages
-        total_spending = sum(r.total for r in results)
-        
-        return [
-            {
-                'category': r.name,
-                'amount': float(r.total),
-                'percentage': (float(r.total) / total_spending * 100) if total_spending > 0 else 0
-            }
-            for r in results
-        ]
+        return query.group_by(Category.name), total
+    
+    @staticmethod
+    def _category_share(row) -> Dict:
+        """Format one aggregated row with its share of the total"""
+        return {
+            'category': row.name,
+            'amount': float(row.total),
+            'percentage': float(row.percentage)
+        }
+    
+    def get_spending_by_category(self, db: Session, user_id: int, start_date: datetime = None, end_date: datetime = None) -> List[Dict]:
+        """Get spending breakdown by category"""
+        query, _ = self._category_spending_query(db, user_id, start_date, end_date)
+        return [self._category_share(r) for r in query.all()]
     
-    def get_monthly_trend(self, user_id: int, months: int = 6) -> List[Dict]:
+    def get_top_category(self, db: Session, user_id: int, start_date: datetime = None) -> Optional[Dict]:
+        """Get the highest-spending category, ranked and limited in SQL"""
+        query, total = self._category_spending_query(db, user_id, start_date)
+        top = query.order_by(total.desc()).limit(1).first()
+        return self._category_share(top) if top else None
+    
+    def get_monthly_trend(self, db: Session, user_id: int, months: int = 6) -> List[Dict]:
         """Get monthly income/expense trend"""
         
         start_date = datetime.now() - timedelta(days=months * 30)
         
-        # Query for monthly aggregates
-        query = self.db.query(
-            extract('year', Transaction.transaction_date).label('year'),
-            extract('month', Transaction.transaction_date).label('month'),
+        # Query for monthly aggregates, keyed by 'YYYY-MM' in SQL
+        month = year_month(Transaction.transaction_date).label('month')
+        query = db.query(
+            month,
             Transaction.transaction_type,
-            func.sum(Transaction.amount).label('total')
+            func.sum(Transaction.amount_inr).label('total')
         ).filter(
             Transaction.user_id == user_id,
             Transaction.transaction_date >= start_date
         ).group_by(
-            'year', 'month', Transaction.transaction_type
+            month, Transaction.transaction_type
         )
         
         results = query.all()
@@ -67,7 +81,7 @@ class AnalyticsService:
         # Process results into monthly summary
         monthly_data = {}
         for r in results:
-            key = f"{r.year}-{r.month:02d}"
+            key = r.month
             if key not in monthly_data:
                 monthly_data[key] = {'income': 0, 'expense': 0}
             
@@ -88,55 +102,36 @@ class AnalyticsService:
         
         return response
     
-    def get_insights(self, user_id: int) -> Dict:
+    def get_insights(self, db: Session, user_id: int) -> Dict:
         """Generate intelligent insights for user"""
         
         # Get last 30 days data
         end_date = datetime.now()
         start_date = end_date - timedelta(days=30)
         
-        # Current month spending
-        current_month_spending = self.db.query(
-            func.sum(Transaction.amount)
-        ).filter(
-            Transaction.user_id == user_id,
-            Transaction.transaction_type == 'expense',
-            Transaction.transaction_date >= start_date
-        ).scalar() or 0
-        
-        # Previous month spending
+        # Current and previous 30-day spending in one pass over the index
         prev_start = start_date - timedelta(days=30)
-        prev_month_spending = self.db.query(
-            func.sum(Transaction.amount)
+        in_current = Transaction.transaction_date >= start_date
+        totals = db.query(
+            func.sum(case((in_current, Transaction.amount_inr), else_=0)).label('current'),
+            func.sum(case((in_current, 0), else_=Transaction.amount_inr)).label('previous')
         ).filter(
             Transaction.user_id == user_id,
             Transaction.transaction_type == 'expense',
-            Transaction.transaction_date >= prev_start,
-            Transaction.transaction_date < start_date
-        ).scalar() or 0
+            Transaction.transaction_date >= prev_start
+        ).one()
+        current_month_spending = totals.current or 0
+        prev_month_spending = totals.previous or 0
         
         # Top spending category
-        top_category = self.db.query(
-            Category.name,
-            func.sum(Transaction.amount).label('total')
-        ).join(
-            Transaction
-        ).filter(
-            Transaction.user_id == user_id,
-            Transaction.transaction_type == 'expense',
-            Transaction.transaction_date >= start_date
-        ).group_by(
-            Category.name
-        ).order_by(
-            func.sum(Transaction.amount).desc()
-        ).first()
+        top_category = self.get_top_category(db, user_id, start_date)
         
         # Generate insights
         insights = {
             'current_month_spending': float(current_month_spending),
             'spending_trend': 'increased' if current_month_spending > prev_month_spending else 'decreased',
             'trend_percentage': abs((current_month_spending - prev_month_spending) / prev_month_spending * 100) if prev_month_spending > 0 else 0,
-            'top_spending_category': top_category.name if top_category else None,
+            'top_spending_category': top_category['category'] if top_category else None,
             'recommendations': []
         }
         
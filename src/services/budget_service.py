@@ -1,38 +1,39 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import func, and_, extract
-from datetime import datetime, timedelta
-from typing import List, Optional
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional
 from ..database.models import Budget, Transaction, Category, Alert, User
 from ..database.schemas import BudgetStatus
 
-class BudgetService:
-    def __init__(self, db: Session):
-        self.db = db
+@lru_cache(maxsize=8)
+def _period_dates(period: str, today: date):
+    """Start and end of the budget period containing today; only changes daily"""
+    now = datetime.combine(today, time())
+    
+    if period == "monthly":
+        start_date = now.replace(day=1)
+        # Get last day of month
+        next_month = start_date.replace(day=28) + timedelta(days=4)
+        end_date = next_month - timedelta(days=next_month.day)
+    elif period == "weekly":
+        # Start from Monday
+        start_date = now - timedelta(days=now.weekday())
+        end_date = start_date + timedelta(days=6, hours=23, minutes=59, seconds=59)
+    else:  # yearly
+        start_date = now.replace(month=1, day=1)
+        end_date = now.replace(month=12, day=31, hour=23, minute=59, second=59)
     
+    return start_date, end_date
+
+class BudgetService:
     def get_budget_period_dates(self, period: str):
         """Get start and end date for budget period"""
-        now = datetime.now()
-        
-        if period == "monthly":
-            start_date = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            # Get last day of month
-            next_month = start_date.replace(day=28) + timedelta(days=4)
-            end_date = next_month - timedelta(days=next_month.day)
-        elif period == "weekly":
-            # Start from Monday
-            days_since_monday = now.weekday()
-            start_date = now - timedelta(days=days_since_monday)
-            start_date = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
-            end_date = start_date + timedelta(days=6, hours=23, minutes=59, seconds=59)
-        else:  # yearly
-            start_date = now.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
-            end_date = now.replace(month=12, day=31, hour=23, minute=59, second=59)
-        
-        return start_date, end_date
+        return _period_dates(period, date.today())
     
-    def get_spent_amount(self, user_id: int, category_id: int, start_date: datetime, end_date: datetime) -> float:
+    def get_spent_amount(self, db: Session, user_id: int, category_id: int, start_date: datetime, end_date: datetime) -> float:
         """Get amount spent in a category during a period"""
-        return self.db.query(func.sum(Transaction.amount)).filter(
+        return db.query(func.sum(Transaction.amount_inr)).filter(
             Transaction.user_id == user_id,
             Transaction.category_id == category_id,
             Transaction.transaction_type == "expense",
@@ -40,10 +41,34 @@ class BudgetService:
             Transaction.transaction_date <= end_date
         ).scalar() or 0
     
-    def check_budget_alert(self, user_id: int, category_id: int) -> Optional[Alert]:
+    def get_spent_amounts(self, db: Session, user_id: int, category_ids, start_date: datetime, end_date: datetime) -> Dict[int, float]:
+        """Get amount spent per category during a period with one grouped query"""
+        return dict(db.query(
+            Transaction.category_id,
+            func.sum(Transaction.amount_inr)
+        ).filter(
+            Transaction.user_id == user_id,
+            Transaction.category_id.in_(category_ids),
+            Transaction.transaction_type == "expense",
+            Transaction.transaction_date >= start_date,
+            Transaction.transaction_date <= end_date
+        ).group_by(Transaction.category_id).all())
+    
+    def _spending_by_period(self, db: Session, user_id: int, budgets: List[Budget]):
+        """Period dates and per-category spending for budgets, one grouped SUM per distinct period"""
+        periods = {budget.period: self.get_budget_period_dates(budget.period) for budget in budgets}
+        spent_by_period = {
+            period: self.get_spent_amounts(
+                db, user_id, [b.category_id for b in budgets if b.period == period], start_date, end_date
+            )
+            for period, (start_date, end_date) in periods.items()
+        }
+        return periods, spent_by_period
+    
+    def check_budget_alert(self, db: Session, user_id: int, category_id: int) -> Optional[Alert]:
         """Check if budget alert should be created"""
         # Get active budget for category
-        budget = self.db.query(Budget).filter(
+        budget = db.query(Budget).filter(
             Budget.user_id == user_id,
             Budget.category_id == category_id,
             Budget.is_active == True
@@ -54,14 +79,14 @@ class BudgetService:
         
         # Get spending for budget period
         start_date, end_date = self.get_budget_period_dates(budget.period)
-        spent = self.get_spent_amount(user_id, category_id, start_date, end_date)
+        spent = self.get_spent_amount(db, user_id, category_id, start_date, end_date)
         
         percentage = (spent / budget.amount) * 100 if budget.amount > 0 else 0
         
         # Check if alert needed
         if percentage >= (budget.alert_threshold * 100):
             # Check if alert already exists for this period
-            existing_alert = self.db.query(Alert).filter(
+            existing_alert = db.query(Alert).filter(
                 Alert.user_id == user_id,
                 Alert.alert_type == "budget_exceed",
                 Alert.created_at >= start_date,
@@ -77,21 +102,87 @@ class BudgetService:
                     title=f"{budget.category.name} Budget {status.title()}!",
                     message=f"You've spent ₹{spent:,.2f} ({percentage:.1f}%) of your ₹{budget.amount:,.2f} {budget.period} budget for {budget.category.name}."
                 )
-                self.db.add(alert)
-                self.db.commit()
+                db.add(alert)
+                db.commit()
                 return alert
         
         return None
     
-    def get_budget_status(self, budget_id: int) -> BudgetStatus:
+    def check_budget_alerts_bulk(self, db: Session, user_id: int, category_ids) -> List[Alert]:
+        """Check budget alerts for every category touched by an import at once"""
+        budgets = db.query(Budget).options(joinedload(Budget.category)).filter(
+            Budget.user_id == user_id,
+            Budget.category_id.in_(set(category_ids)),
+            Budget.is_active == True
+        ).all()
+        
+        if not budgets:
+            return []
+        
+        periods, spent_by_period = self._spending_by_period(db, user_id, budgets)
+        
+        # Existing budget alerts since the earliest period start, fetched once
+        earliest_start = min(start_date for start_date, _ in periods.values())
+        existing_alerts = db.query(Alert.title, Alert.created_at).filter(
+            Alert.user_id == user_id,
+            Alert.alert_type == "budget_exceed",
+            Alert.created_at >= earliest_start
+        ).all()
+        
+        alerts = []
+        for budget in budgets:
+            start_date, _ = periods[budget.period]
+            spent = spent_by_period[budget.period].get(budget.category_id) or 0
+            percentage = (spent / budget.amount) * 100 if budget.amount > 0 else 0
+            
+            if percentage < (budget.alert_threshold * 100):
+                continue
+            if any(created_at >= start_date and budget.category.name in title for title, created_at in existing_alerts):
+                continue
+            
+            status = "exceeded" if percentage >= 100 else "warning"
+            alerts.append(Alert(
+                user_id=user_id,
+                alert_type="budget_exceed",
+                title=f"{budget.category.name} Budget {status.title()}!",
+                message=f"You've spent ₹{spent:,.2f} ({percentage:.1f}%) of your ₹{budget.amount:,.2f} {budget.period} budget for {budget.category.name}."
+            ))
+        
+        if alerts:
+            db.add_all(alerts)
+            db.commit()
+        
+        return alerts
+    
+    def get_budget_status(self, db: Session, budget_id: int) -> BudgetStatus:
         """Get detailed budget status"""
-        budget = self.db.query(Budget).filter(Budget.id == budget_id).first()
+        budget = db.query(Budget).filter(Budget.id == budget_id).first()
         if not budget:
             return None
         
         start_date, end_date = self.get_budget_period_dates(budget.period)
-        spent = self.get_spent_amount(budget.user_id, budget.category_id, start_date, end_date)
+        spent = self.get_spent_amount(db, budget.user_id, budget.category_id, start_date, end_date)
+        return self._budget_status(budget, spent, end_date)
+    
+    def get_budgets_status(self, db: Session, budgets: List[Budget]) -> List[BudgetStatus]:
+        """Get status for several budgets of one user, one spending query per period"""
+        if not budgets:
+            return []
+        
+        periods, spent_by_period = self._spending_by_period(db, budgets[0].user_id, budgets)
         
+        return [
+            self._budget_status(
+                budget,
+                spent_by_period[budget.period].get(budget.category_id) or 0,
+                periods[budget.period][1]
+            )
+            for budget in budgets
+        ]
+    
+    @staticmethod
+    def _budget_status(budget: Budget, spent: float, end_date: datetime) -> BudgetStatus:
+        """Build the status of a budget from its spending in the current period"""
         remaining = budget.amount - spent
         percentage = (spent / budget.amount * 100) if budget.amount > 0 else 0
         days_left = (end_date - datetime.now()).days + 1
@@ -1,9 +1,32 @@
+import os
+import threading
+import time
 import requests
-from typing import Dict, Optional
-from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
 from sqlalchemy.orm import Session
 import json
 
+# Seconds a fetched rate table is reused before hitting the provider again
+EXCHANGE_RATE_TTL = int(os.getenv("EXCHANGE_RATE_TTL", "300"))
+# Base currencies kept in the rate cache; the oldest entry is dropped beyond this
+EXCHANGE_RATE_CACHE_SIZE = 64
+
+# Shared by every CurrencyService instance: base currency -> (expires at, rates).
+# Sync routes run on worker threads, so cache updates go through the lock
+_rate_cache: Dict[str, Tuple[float, Dict[str, float]]] = {}
+_rate_lock = threading.Lock()
+
+# Currency detection keywords, checked in order - the first currency with a hit wins
+CURRENCY_KEYWORDS = (
+    ("USD", ("$", "usd", "dollar", "dollars")),
+    ("EUR", ("€", "eur", "euro", "euros")),
+    ("GBP", ("£", "gbp", "pound", "pounds")),
+    ("AED", ("aed", "dirham", "dirhams", "د.إ")),
+    ("SGD", ("sgd", "s$", "singapore dollar")),
+    ("JPY", ("¥", "jpy", "yen")),
+    ("INR", ("₹", "rs", "rupee", "rupees", "inr")),
+)
+
 class CurrencyService:
     """Service for currency conversion and exchange rates"""
     
@@ -22,15 +45,12 @@ class CurrencyService:
             "JPY": "¥",
             "CNY": "¥"
         }
-        self.exchange_rates = {}
-        self.last_update = None
     
     def get_exchange_rates(self, base_currency: str = "INR") -> Dict[str, float]:
         """Get current exchange rates"""
-        # Cache rates for 1 hour
-        if self.last_update and (datetime.now() - self.last_update) < timedelta(hours=1):
-            if base_currency in self.exchange_rates:
-                return self.exchange_rates[base_currency]
+        cached = _rate_cache.get(base_currency)
+        if cached and cached[0] > time.monotonic():
+            return cached[1]
         
         try:
             # For demo purposes, using mock data
@@ -73,8 +93,11 @@ class CurrencyService:
                 inr_to_base = 1 / rates.get(base_currency, 1)
                 rates = {k: v * inr_to_base for k, v in rates.items()}
             
-            self.exchange_rates[base_currency] = rates
-            self.last_update = datetime.now()
+            with _rate_lock:
+                _rate_cache.pop(base_currency, None)
+                if len(_rate_cache) >= EXCHANGE_RATE_CACHE_SIZE:
+                    del _rate_cache[next(iter(_rate_cache))]
+                _rate_cache[base_currency] = (time.monotonic() + EXCHANGE_RATE_TTL, rates)
             
             return rates
             
@@ -85,18 +108,20 @@ class CurrencyService:
     
     def convert_currency(self, amount: float, from_currency: str, to_currency: str) -> float:
         """Convert amount from one currency to another"""
-        if from_currency == to_currency:
-            return amount
-        
-        rates = self.get_exchange_rates(from_currency)
-        rate = rates.get(to_currency, 1.0)
-        
-        return amount * rate
+        return self.quote(amount, from_currency, to_currency)[0]
     
     def convert_to_inr(self, amount: float, from_currency: str) -> float:
         """Convert any currency to INR"""
         return self.convert_currency(amount, from_currency, "INR")
     
+    def quote(self, amount: float, from_currency: str, to_currency: str = "INR") -> Tuple[float, float]:
+        """Return (converted amount, exchange rate) from a single rate lookup"""
+        if from_currency == to_currency:
+            return amount, 1.0
+        
+        rate = self.get_exchange_rates(from_currency).get(to_currency, 1.0)
+        return amount * rate, rate
+    
     def format_currency(self, amount: float, currency: str) -> str:
         """Format amount with currency symbol"""
         symbol = self.supported_currencies.get(currency, "")
@@ -106,19 +131,9 @@ class CurrencyService:
         """Detect currency from transaction text"""
         text_lower = text.lower()
         
-        # Currency detection patterns
-        currency_patterns = {
-            "USD": ["$", "usd", "dollar", "dollars"],
-            "EUR": ["€", "eur", "euro", "euros"],
-            "GBP": ["£", "gbp", "pound", "pounds"],
-            "AED": ["aed", "dirham", "dirhams", "د.إ"],
-            "SGD": ["sgd", "s$", "singapore dollar"],
-            "JPY": ["¥", "jpy", "yen"],
-            "INR": ["₹", "rs", "rupee", "rupees", "inr"]
-        }
-        
-        for currency, patterns in currency_patterns.items():
-            if any(pattern in text_lower for pattern in patterns):
-                return currency
+        for currency, keywords in CURRENCY_KEYWORDS:
+            for keyword in keywords:
+                if keyword in text_lower:
+                    return currency
         
         return "INR"  # Default to INR
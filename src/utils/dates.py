@@ -0,0 +1,15 @@
+from datetime import datetime
+from functools import lru_cache
+
+
+@lru_cache(maxsize=4096)
+def parse_iso_date(date_str: str) -> datetime:
+    """Parse a YYYY-MM-DD string; imports repeat the same dates, so results are cached"""
+    # Slicing the fixed layout is much cheaper than strptime's regex/locale path
+    year, month, day = date_str[0:4], date_str[5:7], date_str[8:10]
+    if len(date_str) == 10 and date_str[4] == '-' and date_str[7] == '-' and (year + month + day).isdigit():
+        try:
+            return datetime(int(year), int(month), int(day))
+        except ValueError:
+            pass
+    return datetime.strptime(date_str, '%Y-%m-%d')
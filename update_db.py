@@ -1,14 +1,25 @@
-from src.database.database import engine, SessionLocal
+import argparse
+from sqlalchemy import inspect, text
+from src.database.database import engine
+from src.database.migrate import upgrade_to_head
 from src.database.models import Base
 
-# Drop and recreate all tables
+parser = argparse.ArgumentParser(description="Bring the database schema up to date")
+parser.add_argument("--force-reset", action="store_true", help="drop every table first (deletes all data)")
+args = parser.parse_args()
+
+if args.force_reset:
+    print("Dropping all tables...")
+    Base.metadata.drop_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
+
+# Apply pending migrations only; existing tables and data are kept
 print("Updating database schema...")
-Base.metadata.drop_all(bind=engine)
-Base.metadata.create_all(bind=engine)
+upgrade_to_head()
 print("✅ Database schema updated!")
 
 # Verify new tables
-from sqlalchemy import inspect
 inspector = inspect(engine)
 tables = inspector.get_table_names()
 print(f"Tables in database: {tables}")